@@ -51,14 +51,21 @@ logging.basicConfig(
 
 _plugin_instance: StatsProPlugin | None = None
 _command_handler: CommandHandler | None = None
+# 卸载时导出的插件状态，重载后的新模块通过 prev_module 接管
+_handoff_state: dict | None = None
 
 
 def on_load(server: PluginServerInterface, prev_module) -> None:
     """插件加载时调用"""
     global _plugin_instance, _command_handler
 
+    handoff = getattr(prev_module, "_handoff_state", None) if prev_module is not None else None
+    if handoff is not None:
+        # 接管后不再由旧模块持有
+        prev_module._handoff_state = None
+
     _plugin_instance = StatsProPlugin()
-    _plugin_instance.initialize(server)
+    _plugin_instance.initialize(server, handoff)
 
     _command_handler = CommandHandler(_plugin_instance)
     _command_handler.register_commands(server)
@@ -68,15 +75,17 @@ def on_load(server: PluginServerInterface, prev_module) -> None:
 
 def on_unload(server: PluginServerInterface) -> None:
     """插件卸载时调用"""
-    global _plugin_instance
+    global _plugin_instance, _handoff_state
 
     if _plugin_instance:
         _plugin_instance.shutdown()
+        _handoff_state = _plugin_instance.export_state()
         _plugin_instance = None
 
     server.logger.info("StatsPro unloaded")
 
 
 def on_info(server: ServerInterface, info: Info) -> None:
-    """兼容旧版本的消息处理（实际上已被命令树取代）"""
-    pass
+    """处理服务端输出（用于检测存档保存完成），命令由命令树处理"""
+    if _plugin_instance:
+        _plugin_instance.on_info(info)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""机器人玩家识别模块"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections.abc import Iterable
+from pathlib import Path
+
+from .config import BotRulesConfig
+from .constants import PLUGIN_ID
+from .models import FileState
+from .utils import get_file_state
+
+logger = logging.getLogger(PLUGIN_ID)
+
+
+class BotClassifier:
+    """
+    机器人玩家分类器
+
+    判断顺序：allow 名单 > deny 名单与名单文件 > 关键字与正则。
+    关键字与正则合并编译为一个表达式；结果按名称缓存，规则或名单文件变化时清空
+    """
+
+    def __init__(self, rules: BotRulesConfig, root: Path | None = None):
+        """
+        初始化分类器
+
+        Args:
+            rules: 识别规则
+            root: 名单文件的相对路径基准（MCDR 根目录）
+        """
+        root = root or Path(".")
+        self._allow = frozenset(name.lower() for name in rules.allow)
+        self._deny = frozenset(name.lower() for name in rules.deny)
+        self._pattern = self._compile(rules.keywords, rules.patterns)
+        self._tag_paths = [root / path for path in rules.tag_files]
+        self._tag_states: dict[Path, FileState | None] = {}
+        self._tagged: frozenset[str] = frozenset()
+        self._results: dict[str, bool] = {}
+        self.refresh_tags()
+
+    @staticmethod
+    def _compile(keywords: Iterable[str], patterns: Iterable[str]) -> re.Pattern | None:
+        """将关键字与正则合并为一个不区分大小写的表达式，跳过无效正则"""
+        parts = [re.escape(keyword) for keyword in keywords if keyword]
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                logger.warning(f"Invalid bot pattern {pattern!r}: {e}")
+                continue
+            parts.append(f"(?:{pattern})")
+        if not parts:
+            return None
+        return re.compile("|".join(parts), re.IGNORECASE)
+
+    def refresh_tags(self) -> bool:
+        """
+        重新读取发生变化的名单文件
+
+        Returns:
+            名单是否发生变化
+        """
+        states = {path: get_file_state(path) for path in self._tag_paths}
+        if states == self._tag_states:
+            return False
+
+        tagged: set[str] = set()
+        for path, state in states.items():
+            if state is None:
+                continue
+            try:
+                lines = path.read_text(encoding="utf-8").splitlines()
+            except OSError as e:
+                logger.warning(f"Failed to read bot tag file {path}: {e}")
+                continue
+            for line in lines:
+                name = line.split("#", 1)[0].strip()
+                if name:
+                    tagged.add(name.lower())
+
+        self._tag_states = states
+        changed = tagged != self._tagged
+        if changed:
+            self._tagged = frozenset(tagged)
+            self._results = {}
+        return changed
+
+    def is_bot(self, name: str) -> bool:
+        """名称是否为机器人"""
+        result = self._results.get(name)
+        if result is None:
+            result = self._results[name] = self._classify(name)
+        return result
+
+    def _classify(self, name: str) -> bool:
+        lowered = name.lower()
+        if lowered in self._allow:
+            return False
+        if lowered in self._deny or lowered in self._tagged:
+            return True
+        return self._pattern is not None and self._pattern.search(name) is not None
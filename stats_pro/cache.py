@@ -3,12 +3,17 @@
 
 from __future__ import annotations
 
+import heapq
 import logging
+import sys
 import time
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field, fields, is_dataclass
 from functools import wraps
-from threading import Lock
-from typing import Any, Callable, Generic, TypeVar
+from itertools import count
+from threading import Event, Lock
+from typing import Any, Callable, Generic, TypeVar, cast
 
 from .constants import PLUGIN_ID
 
@@ -16,75 +21,270 @@ logger = logging.getLogger(PLUGIN_ID)
 
 T = TypeVar("T")
 
+# 未命中标记，与缓存的 None 区分
+_MISSING: Any = object()
+
+
+def estimate_size(value: Any) -> int:
+    """
+    估算对象占用的内存字节数
+
+    递归累加容器、字符串与数据类字段的 sys.getsizeof，数组按数据大小计算；
+    同一对象只计一次，因此共享的小整数与驻留字符串不会重复计入
+    """
+    seen: set[int] = set()
+    stack = [value]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if hasattr(obj, "nbytes") and hasattr(obj, "dtype"):
+            # NumPy 数组，视图的 getsizeof 不包含数据
+            total += max(sys.getsizeof(obj), obj.nbytes)
+            continue
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif is_dataclass(obj) and not isinstance(obj, type):
+            stack.extend(getattr(obj, f.name) for f in fields(obj))
+    return total
+
 
 @dataclass
 class CacheEntry(Generic[T]):
     """缓存条目"""
 
     value: T
+    # 过期时刻，基于 time.monotonic()
     expires_at: float
     created_at: float = field(default_factory=time.time)
-
-    def is_expired(self) -> bool:
+    # 写入序号，用于识别过期堆中已被覆盖或删除的条目
+    seq: int = 0
+    # 依赖标签，任一标签失效时条目随之失效
+    tags: frozenset[str] = frozenset()
+    # 写入时估算的内存字节数，未设置内存上限时为 0
+    size: int = 0
+
+    def is_expired(self, now: float | None = None) -> bool:
         """检查是否过期"""
-        return time.time() > self.expires_at
+        return (time.monotonic() if now is None else now) > self.expires_at
+
+
+class _Flight:
+    """正在进行的计算，同一键的并发未命中等待其结果"""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self) -> None:
+        self.event = Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
 
 
 class TTLCache(Generic[T]):
-    """带 TTL 的缓存"""
+    """
+    带 TTL 的 LRU 缓存
+
+    条目按最近访问顺序保存在有序字典中，命中时移到末尾，
+    条目数或估算内存超出上限时淘汰最久未访问的条目；
+    过期时间另存于最小堆，读写时惰性清理堆顶已过期的条目，均摊 O(1)。
+    条目可携带依赖标签，通过 标签→键 反向索引按标签使条目失效；
+    失效时可记录数据版本，写入时在同一把锁内拒绝早于该版本计算的值；
+    get_or_compute 对同一键的并发未命中只计算一次
+    """
 
-    def __init__(self, default_ttl: float = 60.0, max_size: int = 1000):
+    def __init__(
+        self,
+        default_ttl: float = 60.0,
+        max_size: int = 1000,
+        max_bytes: int | None = None,
+    ):
         """
         初始化缓存
 
         Args:
             default_ttl: 默认过期时间（秒）
             max_size: 最大缓存条目数
+            max_bytes: 估算内存上限（字节），None 表示不限制
         """
-        self._cache: dict[str, CacheEntry[T]] = {}
+        self._cache: OrderedDict[str, CacheEntry[T]] = OrderedDict()
+        # [(过期时刻, 写入序号, 键)]，被覆盖或删除的条目在弹出时跳过
+        self._expiry: list[tuple[float, int, str]] = []
+        self._seq = count()
+        # {标签: {键, ...}}
+        self._tag_index: dict[str, set[str]] = {}
         self._default_ttl = default_ttl
         self._max_size = max_size
+        self._max_bytes = max_bytes
+        # 当前条目估算内存之和
+        self._bytes = 0
         self._lock = Lock()
         self._hits = 0
         self._misses = 0
-
-    def get(self, key: str) -> T | None:
-        """获取缓存值"""
+        self._evictions = 0
+        self._coalesced = 0
+        # {键: 正在进行的计算}
+        self._flights: dict[str, _Flight] = {}
+        # 最近一次失效对应的数据版本，早于该版本计算的值不再写入
+        self._min_version = 0
+
+    def get(self, key: str, default: Any = None) -> T | Any:
+        """获取缓存值，命中时刷新最近访问顺序，未命中时返回 default"""
         with self._lock:
-            entry = self._cache.get(key)
-            if entry is None:
-                self._misses += 1
-                return None
-            if entry.is_expired():
-                del self._cache[key]
-                self._misses += 1
-                return None
-            self._hits += 1
-            return entry.value
-
-    def set(self, key: str, value: T, ttl: float | None = None) -> None:
-        """设置缓存值"""
+            return self._lookup(key, default)
+
+    def _lookup(self, key: str, default: Any) -> T | Any:
+        """查找并计数，调用方需持有锁"""
+        entry = self._cache.get(key)
+        if entry is None:
+            self._misses += 1
+            return default
+        if entry.is_expired():
+            self._remove(key)
+            self._misses += 1
+            return default
+        self._cache.move_to_end(key)
+        self._hits += 1
+        return entry.value
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], tuple[T, Iterable[str] | None, int | None]],
+        ttl: float | None = None,
+    ) -> T:
+        """
+        获取缓存值，未命中时计算并写入
+
+        同一键的并发未命中只由第一个调用方计算，其余调用方等待并共享其结果或异常
+
+        Args:
+            key: 键
+            compute: 返回 (值, 依赖标签, 计算所用的数据版本)，标签为 None 时结果只返回不写入
+            ttl: 自定义过期时间（秒）
+        """
         with self._lock:
-            if len(self._cache) >= self._max_size:
-                self._evict_expired()
-                if len(self._cache) >= self._max_size:
-                    self._evict_oldest()
+            value = self._lookup(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return cast(T, flight.value)
+
+        try:
+            value, tags, version = compute()
+            if tags is not None:
+                self.set(key, value, ttl, tags, version)
+            flight.value = value
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    def set(
+        self,
+        key: str,
+        value: T,
+        ttl: float | None = None,
+        tags: Iterable[str] = (),
+        version: int | None = None,
+    ) -> bool:
+        """
+        设置缓存值
 
-            expires_at = time.time() + (ttl if ttl is not None else self._default_ttl)
-            self._cache[key] = CacheEntry(value=value, expires_at=expires_at)
+        Args:
+            key: 键
+            value: 值
+            ttl: 自定义过期时间（秒）
+            tags: 依赖标签，用于 invalidate_tags
+            version: 计算该值所用的数据版本，早于最近一次失效的版本时不写入
+
+        Returns:
+            是否写入
+        """
+        # 估算大小的开销与条目大小成正比，未设置内存上限时不估算
+        size = 0 if self._max_bytes is None else estimate_size(value)
+        with self._lock:
+            if version is not None and version < self._min_version:
+                # 计算期间数据已变化并完成失效，写入会缓存过时结果
+                logger.debug(f"Skipped caching {key} computed from stale version {version}")
+                return False
+            now = time.monotonic()
+            self._sweep(now)
+            if key in self._cache:
+                self._remove(key)
+            if self._max_bytes is not None and size > self._max_bytes:
+                logger.debug(f"Cache entry {key} ({size} bytes) exceeds the memory budget")
+                return False
+            self._evict(len(self._cache) + 1 - self._max_size, size)
+
+            expires_at = now + (ttl if ttl is not None else self._default_ttl)
+            seq = next(self._seq)
+            tags = frozenset(tags)
+            self._cache[key] = CacheEntry(
+                value=value, expires_at=expires_at, seq=seq, tags=tags, size=size
+            )
+            self._bytes += size
+            for tag in tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            heapq.heappush(self._expiry, (expires_at, seq, key))
+            self._compact_expiry()
+            return True
 
     def delete(self, key: str) -> bool:
         """删除缓存值"""
         with self._lock:
             if key in self._cache:
-                del self._cache[key]
+                self._remove(key)
                 return True
             return False
 
-    def clear(self) -> None:
-        """清空所有缓存"""
+    def invalidate_tags(self, tags: Iterable[str], version: int = 0) -> int:
+        """
+        使带有任一标签的条目失效
+
+        Args:
+            tags: 发生变化的标签
+            version: 变化后的数据版本，之后不再写入早于该版本计算的值
+
+        Returns:
+            失效的条目数
+        """
         with self._lock:
+            self._min_version = max(self._min_version, version)
+            keys: set[str] = set()
+            for tag in tags:
+                keys.update(self._tag_index.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self, version: int = 0) -> None:
+        """清空所有缓存，version 为变化后的数据版本，之后不再写入早于该版本计算的值"""
+        with self._lock:
+            self._min_version = max(self._min_version, version)
             self._cache.clear()
+            self._expiry.clear()
+            self._tag_index.clear()
+            self._bytes = 0
             logger.debug("Cache cleared")
 
     def invalidate_pattern(self, pattern: str) -> int:
@@ -94,29 +294,94 @@ class TTLCache(Generic[T]):
                 key for key in self._cache if pattern in key
             ]
             for key in keys_to_delete:
-                del self._cache[key]
+                self._remove(key)
             return len(keys_to_delete)
 
-    def _evict_expired(self) -> int:
-        """清除所有过期条目"""
-        now = time.time()
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if entry.expires_at <= now
-        ]
-        for key in expired_keys:
-            del self._cache[key]
-        return len(expired_keys)
-
-    def _evict_oldest(self) -> None:
-        """清除最旧的条目"""
-        if not self._cache:
-            return
-        oldest_key = min(
-            self._cache.keys(),
-            key=lambda k: self._cache[k].created_at
-        )
-        del self._cache[oldest_key]
+    def sweep(self) -> int:
+        """清除所有已过期的条目"""
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def _sweep(self, now: float) -> int:
+        """从过期堆顶依次清除已过期的条目，返回清除数量"""
+        expiry = self._expiry
+        removed = 0
+        while expiry and expiry[0][0] < now:
+            _, seq, key = heapq.heappop(expiry)
+            entry = self._cache.get(key)
+            if entry is not None and entry.seq == seq:
+                self._remove(key)
+                removed += 1
+        return removed
+
+    def export_entries(self) -> list[tuple[str, T, float, tuple[str, ...]]]:
+        """导出未过期的条目 [(键, 值, 剩余时间, 标签), ...]，按最近访问顺序排列"""
+        with self._lock:
+            now = time.monotonic()
+            self._sweep(now)
+            return [
+                (key, entry.value, entry.expires_at - now, tuple(entry.tags))
+                for key, entry in self._cache.items()
+            ]
+
+    def import_entries(self, entries: Iterable[tuple[str, T, float, Iterable[str]]]) -> int:
+        """导入 export_entries 导出的条目，保留剩余时间与访问顺序，返回导入后的条目数"""
+        for key, value, ttl, tags in entries:
+            if ttl > 0:
+                self.set(key, value, ttl=ttl, tags=tags)
+        return self.size
+
+    def reset(self) -> None:
+        """清空所有缓存并重置失效版本"""
+        self.clear()
+        with self._lock:
+            self._min_version = 0
+
+    def set_max_bytes(self, max_bytes: int | None) -> None:
+        """调整内存上限，超出部分立即按 LRU 淘汰"""
+        with self._lock:
+            if (self._max_bytes is None) != (max_bytes is None):
+                # 启用上限时补算已有条目的大小，取消上限时不再计入
+                for entry in self._cache.values():
+                    entry.size = 0 if max_bytes is None else estimate_size(entry.value)
+                self._bytes = sum(entry.size for entry in self._cache.values())
+            self._max_bytes = max_bytes
+            self._evict(len(self._cache) - self._max_size, 0)
+
+    def _evict(self, excess: int, incoming: int) -> None:
+        """
+        按 LRU 淘汰条目，调用方需持有锁
+
+        Args:
+            excess: 需要腾出的条目数
+            incoming: 即将写入的条目大小
+        """
+        max_bytes = self._max_bytes
+        while self._cache and (
+            excess > 0 or (max_bytes is not None and self._bytes + incoming > max_bytes)
+        ):
+            self._remove(next(iter(self._cache)))
+            self._evictions += 1
+            excess -= 1
+
+    def _remove(self, key: str) -> None:
+        """删除条目并从标签索引中移除，调用方需持有锁"""
+        entry = self._cache.pop(key)
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _compact_expiry(self) -> None:
+        """堆中失效记录过多时重建，避免覆盖写入使堆无限增长"""
+        if len(self._expiry) > 2 * len(self._cache) + 64:
+            self._expiry = [
+                (entry.expires_at, entry.seq, key) for key, entry in self._cache.items()
+            ]
+            heapq.heapify(self._expiry)
 
     @property
     def size(self) -> int:
@@ -131,84 +396,208 @@ class TTLCache(Generic[T]):
         return {
             "size": self.size,
             "max_size": self._max_size,
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
             "hits": self._hits,
             "misses": self._misses,
+            "evictions": self._evictions,
+            "coalesced": self._coalesced,
             "hit_rate": f"{hit_rate:.1f}%",
         }
 
 
+# 缓存计算结果 (值, 计算所用的快照版本, 依赖标签)
+ComputeResult = tuple[Any, int, Iterable[str]]
+
+# 任一统计数据变化时失效的标签
+ANY_TAG = "any"
+# 键字典新增 (类别, 物品) 键时失效的标签，用于选择器等依赖键集合的条目
+CATALOG_TAG = "catalog"
+
+
+def key_tag(key_id: int) -> str:
+    """单个 (类别, 物品) 键的标签"""
+    return f"key:{key_id}"
+
+
+def category_tag(category: str) -> str:
+    """类别的标签，类别下任一键变化时失效"""
+    return f"category:{category}"
+
+
+def item_tag(item: str) -> str:
+    """物品的标签，任一类别下该物品变化时失效"""
+    return f"item:{item}"
+
+
+def player_tag(uuid: str) -> str:
+    """玩家的标签，该玩家任一数据变化时失效"""
+    return f"player:{uuid}"
+
+
 class StatsCache:
-    """统计数据专用缓存"""
+    """
+    统计数据专用缓存
+
+    跨玩家的计算结果携带依赖标签（键、类别、物品与玩家），
+    数据变化时只使依赖变化部分的条目失效；
+    写入时若计算所用的快照早于最近一次失效，则不写入，避免缓存过时结果，
+    该检查与失效在各缓存的同一把锁内完成；
+    同一条目的并发未命中只计算一次
+    """
 
-    def __init__(self, ttl: float = 30.0):
+    def __init__(self, ttl: float = 30.0, max_bytes: int | None = None):
         """
         初始化统计缓存
 
         Args:
             ttl: 缓存过期时间（秒），默认30秒
+            max_bytes: 每个缓存的估算内存上限（字节），None 表示不限制
         """
-        self._player_cache: TTLCache[dict] = TTLCache(default_ttl=ttl)
-        self._ranking_cache: TTLCache[dict] = TTLCache(default_ttl=ttl)
-        self._sum_cache: TTLCache[dict] = TTLCache(default_ttl=ttl)
+        # 排行榜缓存存放按分数降序排列的 id 形式的行 [(分数, 玩家名 id, 键 id), ...]
+        self._ranking_cache: TTLCache[list] = TTLCache(default_ttl=ttl, max_bytes=max_bytes)
+        self._sum_cache: TTLCache[dict] = TTLCache(default_ttl=ttl, max_bytes=max_bytes)
+        self._dist_cache: TTLCache[Any] = TTLCache(default_ttl=ttl, max_bytes=max_bytes)
+        # 派生指标缓存存放 (UUID 列表, 数值列表)
+        self._derived_cache: TTLCache[tuple] = TTLCache(default_ttl=ttl, max_bytes=max_bytes)
+        # 分组排行缓存存放按分数降序排列的 [(分组名, 分数), ...]
+        self._group_cache: TTLCache[list] = TTLCache(default_ttl=ttl, max_bytes=max_bytes)
         self._ttl = ttl
 
-    def get_player_stats(self, player: str) -> dict | None:
-        """获取玩家统计缓存"""
-        return self._player_cache.get(f"player:{player}")
+    @property
+    def _tagged_caches(self) -> tuple[TTLCache, ...]:
+        return (
+            self._ranking_cache,
+            self._sum_cache,
+            self._dist_cache,
+            self._derived_cache,
+            self._group_cache,
+        )
+
+    @staticmethod
+    def _get_or_compute(
+        cache: TTLCache[T], key: str, compute: Callable[[], ComputeResult]
+    ) -> T:
+        """单飞读取，计算所用快照已过时的结果只返回不写入"""
+
+        def run() -> tuple[T, Iterable[str] | None, int | None]:
+            value, version, tags = compute()
+            return value, tags, version
+
+        return cache.get_or_compute(key, run)
+
+    def get_or_compute_ranking(
+        self,
+        category: str | None,
+        item: str | None,
+        include_bots: bool,
+        compute: Callable[[], ComputeResult],
+    ) -> list:
+        """获取排行榜缓存，未命中时计算"""
+        return self._get_or_compute(
+            self._ranking_cache, f"rank:{category}:{item}:{include_bots}", compute
+        )
 
-    def set_player_stats(self, player: str, stats: dict) -> None:
-        """设置玩家统计缓存"""
-        self._player_cache.set(f"player:{player}", stats)
+    def get_or_compute_sum(self, players_key: str, compute: Callable[[], ComputeResult]) -> dict:
+        """获取汇总缓存，未命中时计算"""
+        return self._get_or_compute(self._sum_cache, f"sum:{players_key}", compute)
 
-    def get_ranking(
+    def get_or_compute_distribution(
         self,
-        category: str | None = None,
-        item: str | None = None,
-        include_bots: bool = False,
-    ) -> dict | None:
-        """获取排行榜缓存"""
-        key = f"rank:{category}:{item}:{include_bots}"
-        return self._ranking_cache.get(key)
-
-    def set_ranking(
+        category: str,
+        item: str,
+        include_bots: bool,
+        compute: Callable[[], ComputeResult],
+    ) -> Any:
+        """获取分布缓存，未命中时计算；没有数据时的 None 同样会被缓存"""
+        return self._get_or_compute(
+            self._dist_cache, f"dist:{category}:{item}:{include_bots}", compute
+        )
+
+    def get_or_compute_derived(self, name: str, compute: Callable[[], ComputeResult]) -> tuple:
+        """获取派生指标缓存，未命中时计算"""
+        return self._get_or_compute(self._derived_cache, f"derived:{name}", compute)
+
+    def get_or_compute_group_ranking(
         self,
-        ranking: dict,
-        category: str | None = None,
-        item: str | None = None,
-        include_bots: bool = False,
-    ) -> None:
-        """设置排行榜缓存"""
-        key = f"rank:{category}:{item}:{include_bots}"
-        self._ranking_cache.set(key, ranking)
-
-    def get_sum(self, players_key: str) -> dict | None:
-        """获取汇总缓存"""
-        return self._sum_cache.get(f"sum:{players_key}")
-
-    def set_sum(self, players_key: str, data: dict) -> None:
-        """设置汇总缓存"""
-        self._sum_cache.set(f"sum:{players_key}", data)
-
-    def invalidate_player(self, player: str) -> None:
-        """使玩家缓存失效"""
-        self._player_cache.delete(f"player:{player}")
-        self._ranking_cache.clear()
-        self._sum_cache.clear()
-
-    def invalidate_all(self) -> None:
-        """使所有缓存失效"""
-        self._player_cache.clear()
-        self._ranking_cache.clear()
-        self._sum_cache.clear()
+        category: str,
+        item: str,
+        include_bots: bool,
+        revision: int,
+        compute: Callable[[], ComputeResult],
+    ) -> list:
+        """获取分组排行缓存，未命中时计算，revision 为分组版本"""
+        return self._get_or_compute(
+            self._group_cache, f"group:{revision}:{category}:{item}:{include_bots}", compute
+        )
+
+    def invalidate_tags(self, tags: Iterable[str], version: int = 0) -> int:
+        """
+        使依赖任一标签的条目失效
+
+        Args:
+            tags: 发生变化的标签
+            version: 变化后发布的快照版本
+
+        Returns:
+            失效的条目数
+        """
+        tags = set(tags)
+        return sum(cache.invalidate_tags(tags, version) for cache in self._tagged_caches)
+
+    def invalidate_player(self, uuid: str) -> None:
+        """使依赖该玩家的条目失效"""
+        self.invalidate_tags((player_tag(uuid),))
+
+    def invalidate_all(self, version: int = 0) -> None:
+        """使所有缓存失效，version 为变化后发布的快照版本"""
+        for cache in self._tagged_caches:
+            cache.clear(version)
         logger.debug("All stats cache invalidated")
 
+    def reset(self) -> None:
+        """清空所有缓存并重置失效版本，新的服务实例接管全局缓存时调用"""
+        for cache in self._tagged_caches:
+            cache.reset()
+
+    @property
+    def _handoff_caches(self) -> dict[str, TTLCache]:
+        # 分布缓存的值为数据类实例，分组缓存的键包含分组版本，重载后均不可复用
+        return {
+            "ranking": self._ranking_cache,
+            "sum": self._sum_cache,
+            "derived": self._derived_cache,
+        }
+
+    def export_state(self) -> dict[str, list]:
+        """导出可在插件重载后复用的条目，值与标签均为内置类型"""
+        return {name: cache.export_entries() for name, cache in self._handoff_caches.items()}
+
+    def import_state(self, state: dict[str, list]) -> int:
+        """导入 export_state 导出的条目，返回导入的条目数"""
+        return sum(
+            cache.import_entries(state.get(name, ()))
+            for name, cache in self._handoff_caches.items()
+        )
+
+    def set_max_bytes(self, max_bytes: int | None) -> None:
+        """调整每个缓存的内存上限"""
+        for cache in self._tagged_caches:
+            cache.set_max_bytes(max_bytes)
+
+    def sweep(self) -> int:
+        """清除所有缓存中已过期的条目"""
+        return sum(cache.sweep() for cache in self._tagged_caches)
+
     @property
     def stats(self) -> dict[str, dict]:
         """获取所有缓存的统计信息"""
         return {
-            "player_cache": self._player_cache.stats,
             "ranking_cache": self._ranking_cache.stats,
             "sum_cache": self._sum_cache.stats,
+            "dist_cache": self._dist_cache.stats,
+            "derived_cache": self._derived_cache.stats,
+            "group_cache": self._group_cache.stats,
         }
 
 
@@ -220,6 +609,8 @@ def cached(
     """
     缓存装饰器
 
+    返回 None 或空结果同样会被缓存，并发调用同一键时只执行一次
+
     Args:
         cache: 缓存实例
         key_func: 生成缓存键的函数
@@ -233,13 +624,7 @@ def cached(
             else:
                 key = f"{func.__name__}:{args}:{sorted(kwargs.items())}"
 
-            cached_value = cache.get(key)
-            if cached_value is not None:
-                return cached_value
-
-            result = func(*args, **kwargs)
-            cache.set(key, result, ttl)
-            return result
+            return cache.get_or_compute(key, lambda: (func(*args, **kwargs), (), None), ttl)
 
         wrapper.cache = cache  # type: ignore
         wrapper.invalidate = lambda: cache.clear()  # type: ignore
@@ -252,9 +637,11 @@ def cached(
 _stats_cache: StatsCache | None = None
 
 
-def get_stats_cache(ttl: float = 30.0) -> StatsCache:
-    """获取全局统计缓存实例"""
+def get_stats_cache(ttl: float = 30.0, max_bytes: int | None = None) -> StatsCache:
+    """获取全局统计缓存实例，实例已存在时更新其内存上限"""
     global _stats_cache
     if _stats_cache is None:
-        _stats_cache = StatsCache(ttl=ttl)
+        _stats_cache = StatsCache(ttl=ttl, max_bytes=max_bytes)
+    else:
+        _stats_cache.set_max_bytes(max_bytes)
     return _stats_cache
@@ -3,6 +3,9 @@
 
 from __future__ import annotations
 
+import heapq
+import re
+from operator import itemgetter
 from typing import TYPE_CHECKING, Callable
 
 from mcdreforged.api.all import CommandSource
@@ -14,16 +17,41 @@ from mcdreforged.api.command import (
     QuotableText,
     Text,
 )
+from mcdreforged.api.decorator import new_thread
 from mcdreforged.api.rtext import RAction, RText, RTextList
 
 from .constants import COMMAND_PREFIX, LEGACY_PREFIXES, PLUGIN_ID, PLUGIN_VERSION, Permission
 from .i18n import t
+from .selectors import compile_selector
+from .stats_service import is_derived_category
 from .utils import MessageBuilder, clickable_text, strip_prefix
 
 if TYPE_CHECKING:
     from mcdreforged.api.all import Info, PluginServerInterface, ServerInterface
 
+    from .group_service import GroupService
     from .plugin import StatsProPlugin
+    from .save_coordinator import SaveCoordinator
+
+
+# 分布直方图最长条形的字符数
+DIST_BAR_WIDTH = 20
+
+
+def _format_number(value: float) -> str:
+    """格式化数值，整数不带小数部分"""
+    return str(int(value)) if float(value).is_integer() else f"{value:.1f}"
+
+
+def _format_bytes(size: float) -> str:
+    """格式化字节数"""
+    if size < 1024:
+        return f"{int(size)} B"
+    for unit in ("KB", "MB"):
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1024:.1f} GB"
 
 
 class CommandHandler:
@@ -53,6 +81,14 @@ class CommandHandler:
     def merge_service(self):
         return self.plugin.merge_service
 
+    @property
+    def group_service(self) -> GroupService:
+        return self.plugin.group_service
+
+    @property
+    def save_coordinator(self) -> SaveCoordinator:
+        return self.plugin.save_coordinator
+
     def register_commands(self, server: PluginServerInterface) -> None:
         """注册所有命令"""
         server.register_command(self._build_command_tree())
@@ -99,12 +135,23 @@ class CommandHandler:
             .then(self._build_query_tree())
             # rank
             .then(self._build_rank_tree())
+            # stats
+            .then(
+                Literal("stats")
+                .then(
+                    Literal("dist")
+                    .then(Text("category").then(Text("item").runs(self.cmd_stats_dist)))
+                )
+                .then(Literal("cache").runs(self.cmd_stats_cache))
+            )
             # sum
             .then(self._build_sum_tree())
             # gen
             .then(self._build_gen_tree())
             # merge
             .then(self._build_merge_tree())
+            # group
+            .then(self._build_group_tree())
             # change
             .then(
                 Literal("change")
@@ -169,6 +216,13 @@ class CommandHandler:
         """构建 rank 子命令树"""
         return (
             Literal("rank")
+            .then(
+                Literal("pos")
+                .then(
+                    Text("player")
+                    .then(Text("category").then(Text("item").runs(self.cmd_rank_pos)))
+                )
+            )
             .then(
                 Literal("query")
                 .then(
@@ -196,6 +250,17 @@ class CommandHandler:
                     .then(Integer("limit").runs(self.cmd_rank_item))
                 )
             )
+            .then(
+                Literal("group")
+                .then(
+                    Text("category")
+                    .then(
+                        Text("item")
+                        .runs(self.cmd_rank_group)
+                        .then(Integer("limit").runs(self.cmd_rank_group))
+                    )
+                )
+            )
             .then(
                 Text("category")
                 .then(
@@ -308,10 +373,45 @@ class CommandHandler:
             .then(Literal("exec").runs(self.cmd_merge_exec))
         )
 
+    def _build_group_tree(self) -> Literal:
+        """构建 group 子命令树"""
+        return (
+            Literal("group")
+            .then(
+                Literal("add")
+                .then(Text("group").then(Text("player").runs(self.cmd_group_add)))
+            )
+            .then(
+                Literal("del")
+                .then(Text("group").then(Text("player").runs(self.cmd_group_del)))
+            )
+            .then(Literal("list").runs(self.cmd_group_list))
+            .then(Literal("sync").runs(self.cmd_group_sync))
+        )
+
     def _legacy_redirect(self, source: CommandSource) -> None:
         """处理旧命令前缀"""
         self._reply(source, t("legacy.redirect", prefix=COMMAND_PREFIX))
 
+    def _check_selectors(self, source: CommandSource, *texts: str) -> bool:
+        """检查选择器能否编译，无效时回复错误信息"""
+        for text in texts:
+            try:
+                compile_selector(text)
+            except re.error as e:
+                self._reply(source, t("selector.invalid", selector=text, error=e))
+                return False
+        return True
+
+    def _check_metric(self, source: CommandSource, category: str, item: str) -> bool:
+        """检查选择器与派生指标名，无效时回复错误信息"""
+        if not self._check_selectors(source, category, item):
+            return False
+        if is_derived_category(category) and item not in self.stats_service.derived_metrics:
+            self._reply(source, t("derived.unknown", name=item))
+            return False
+        return True
+
     def _reply(self, source: CommandSource, message: str, prefix: str = "") -> None:
         """回复消息"""
         if prefix == "":
@@ -329,15 +429,29 @@ class CommandHandler:
             return False
         return True
 
-    def _save_server(self, source: CommandSource, reload: bool = True) -> None:
-        """保存服务器"""
+    def _save_server(
+        self, source: CommandSource, reload: bool = True, wait: bool = False
+    ) -> None:
+        """
+        保存服务器
+
+        多个命令同时请求时只发送一次 save-all，保存完成后自动触发增量刷新
+
+        Args:
+            reload: 是否先执行 reload
+            wait: 是否等待保存与统计数据刷新完成；为 False 时直接使用最新快照作答
+        """
         server = source.get_server()
         if reload:
             server.execute("reload")
-        server.execute("save-off")
-        server.execute("save-all")
-        server.execute("save-on")
-        self.stats_service.reload_all_stats()
+        generation = self.save_coordinator.request_save(server)
+        if wait:
+            # on_info 在任务执行线程中分发，在该线程中等待只会等到超时
+            if not server.is_on_executor_thread():
+                self.save_coordinator.wait(generation)
+            self.stats_service.refresh_now()
+        else:
+            self.stats_service.ensure_fresh()
 
     def cmd_help(self, source: CommandSource, context: dict = None) -> None:
         """显示帮助信息"""
@@ -370,6 +484,12 @@ class CommandHandler:
   {p} rank §5<类别>§r §6<物品>§r §7[数量]§r 查询排行
   {p} rank cls §5<类别>§r §7[数量]§r 类别排行
   {p} rank item §6<物品>§r §7[数量]§r 物品排行
+  {p} rank pos §c<玩家>§r §5<类别>§r §6<物品>§r 查询名次
+  {p} rank group §5<类别>§r §6<物品>§r §7[数量]§r 分组排行
+§d§l{p}§r§b stats dist§r §5<类别>§r §6<物品>§r 查看分布
+§d§l{p}§r§b stats cache§r 查看缓存占用
+  §7类别与物品支持通配符(*_pickaxe)与正则(re:.*_ore)§r
+  §7类别为 derived 时使用配置中的派生指标§r
 §d§l{p}§r§b sum§r 加和计分板
   {p} sum make/clear §a[预设名]§r 创建/清除
   {p} sum create §a<预设名>§r 创建预设
@@ -385,6 +505,10 @@ class CommandHandler:
   {p} merge add/del §c<玩家>§r 添加/删除输入
   {p} merge set §c<玩家>§r 设置输出
   {p} merge list / exec 列表/执行
+§d§l{p}§r§c group§r 玩家分组 §8(修改需要helper权限)
+  {p} group add §a<分组>§r §c<玩家>§r 添加成员
+  {p} group del §a<分组>§r §c<玩家/all>§r 删除成员/分组
+  {p} group list / sync 列表/从游戏内队伍同步
 §d§l{p}§r§c change§r §5<类别1>§r §6<物品1>§r §5<类别2>§r §6<物品2>§r 转移数据""",
         ]
 
@@ -413,9 +537,10 @@ class CommandHandler:
             )
         source.reply(nav)
 
+    @new_thread("StatsPro")
     def cmd_scoreboard(self, source: CommandSource, context: dict) -> None:
         """创建计分板"""
-        self._save_server(source, reload=False)
+        self._save_server(source, reload=False, wait=True)
 
         category = context["category"]
         item = context["item"]
@@ -434,9 +559,10 @@ class CommandHandler:
         display = display_name or f"§e{category}§r.§b{item}§r"
         self._reply(source, t("scoreboard.created", name=display))
 
+    @new_thread("StatsPro")
     def cmd_save(self, source: CommandSource) -> None:
         """保存服务器"""
-        self._save_server(source)
+        self._save_server(source, wait=True)
         self._reply(source, t("save.success"))
 
     def cmd_set_display(self, source: CommandSource, context: dict = None) -> None:
@@ -457,6 +583,8 @@ class CommandHandler:
         player = context["player"]
         category = context["category"]
         item = context["item"]
+        if not self._check_selectors(source, category, item):
+            return
 
         score = self.stats_service.get_score(player, category, item)
         name = self.stats_service.convert_to_name(player)
@@ -503,6 +631,8 @@ class CommandHandler:
         category = context["category"]
         item = context["item"]
         limit = context.get("limit", 15)
+        if not self._check_selectors(source, category, item):
+            return
 
         ranking = self.stats_service.get_ranking(
             category=category,
@@ -533,6 +663,120 @@ class CommandHandler:
         ranking = self.stats_service.get_ranking(item=item, limit=limit)
         self._print_ranking(source, ranking, f"[§b{item}§r]", limit)
 
+    def cmd_rank_group(self, source: CommandSource, context: dict) -> None:
+        """查看分组排行"""
+        self._save_server(source)
+
+        category = context["category"]
+        item = context["item"]
+        limit = context.get("limit", 15)
+        if not self._check_selectors(source, category, item):
+            return
+
+        ranking = self.stats_service.get_group_ranking(category, item, limit=limit)
+        self._print_ranking(
+            source, ranking, f"分组[§e{category}§r.§b{item}§r]", limit
+        )
+
+    def cmd_rank_pos(self, source: CommandSource, context: dict) -> None:
+        """查看玩家名次"""
+        self._save_server(source)
+
+        player = context["player"]
+        category = context["category"]
+        item = context["item"]
+        if not self._check_metric(source, category, item):
+            return
+
+        position = self.stats_service.get_rank_position(player, category, item)
+        if position is None:
+            self._reply(
+                source,
+                t("rank.position_not_found", player=player, category=category, item=item),
+            )
+            return
+
+        self._reply(
+            source,
+            t(
+                "rank.position",
+                player=position.player,
+                category=category,
+                item=item,
+                score=position.score,
+                position=position.position,
+                total=position.total,
+                percentile=f"{position.percentile:.1f}",
+            ),
+        )
+
+    def cmd_stats_dist(self, source: CommandSource, context: dict) -> None:
+        """查看统计分布"""
+        self._save_server(source)
+
+        category = context["category"]
+        item = context["item"]
+        if not self._check_selectors(source, category, item):
+            return
+
+        dist = self.stats_service.get_distribution(category, item)
+        if dist is None:
+            self._reply(source, t("dist.empty", category=category, item=item))
+            return
+
+        self._broadcast(
+            source,
+            t(
+                "dist.title",
+                category=category,
+                item=item,
+                count=dist.count,
+                total=_format_number(dist.total),
+                mean=_format_number(dist.mean),
+            ),
+        )
+        percentiles = " / ".join(
+            f"p{p} {_format_number(v)}" for p, v in dist.percentiles.items()
+        )
+        self._broadcast(
+            source,
+            t(
+                "dist.summary",
+                min=_format_number(dist.minimum),
+                max=_format_number(dist.maximum),
+                percentiles=percentiles,
+            ),
+        )
+
+        peak = max(count for _, _, count in dist.histogram)
+        for low, high, count in dist.histogram:
+            bar = "|" * round(count / peak * DIST_BAR_WIDTH) if peak else ""
+            self._broadcast(
+                source,
+                f"§7{_format_number(low)}~{_format_number(high)}§r §a{bar}§r {count}",
+            )
+
+    def cmd_stats_cache(self, source: CommandSource) -> None:
+        """查看缓存占用"""
+        self._reply(source, t("cache.title"), "")
+        for name, info in self.stats_service.cache_stats.items():
+            # 未设置内存上限时不估算条目大小
+            memory = "-"
+            if info["max_bytes"] is not None:
+                memory = f"{_format_bytes(info['bytes'])} / {_format_bytes(info['max_bytes'])}"
+            self._reply(
+                source,
+                t(
+                    "cache.line",
+                    name=name,
+                    size=info["size"],
+                    max_size=info["max_size"],
+                    memory=memory,
+                    hit_rate=info["hit_rate"],
+                ),
+                "",
+            )
+
     def _print_ranking(
         self,
         source: CommandSource,
@@ -545,9 +789,7 @@ class CommandHandler:
             self._reply(source, t("query.no_data"))
             return
 
-        sorted_ranking = dict(
-            sorted(ranking.items(), key=lambda x: x[1], reverse=True)[:limit]
-        )
+        sorted_ranking = dict(heapq.nlargest(limit, ranking.items(), key=itemgetter(1)))
         total = sum(ranking.values())
 
         self._broadcast(source, f"{title}的总和为{total}, 前{len(sorted_ranking)}名如下:")
@@ -561,6 +803,7 @@ class CommandHandler:
             padding = " " * (max_name_len - len(name))
             self._broadcast(source, f"{color}#{i} {name}{padding}  {value}")
 
+    @new_thread("StatsPro")
     def cmd_sum_make(self, source: CommandSource, context: dict = None) -> None:
         """创建加和计分板"""
         context = context or {}
@@ -571,7 +814,7 @@ class CommandHandler:
             self._reply(source, t("preset.not_found", name=preset_name))
             return
 
-        self._save_server(source)
+        self._save_server(source, wait=True)
         self.scoreboard_service.create_sum_scoreboard(source.get_server(), preset)
         self._reply(source, t("sum.created", preset=preset_name))
 
@@ -636,6 +879,8 @@ class CommandHandler:
         if preset_name == "default":
             self._reply(source, t("preset.cannot_modify_default"))
             return
+        if not self._check_selectors(source, category, item):
+            return
 
         preset = self.config.get_preset(preset_name)
         if preset is None:
@@ -686,9 +931,10 @@ class CommandHandler:
         self.config.save()
         self._reply(source, t("preset.cleared", name=preset_name))
 
+    @new_thread("StatsPro")
     def cmd_sum_remove_all(self, source: CommandSource) -> None:
         """删除所有自定义预设"""
-        self._save_server(source)
+        self._save_server(source, wait=True)
 
         removed = []
         for name in list(self.config.presets.keys()):
@@ -741,12 +987,13 @@ class CommandHandler:
             for item, abbr in items.items():
                 self._reply(source, f"  - {item} : {abbr}", "")
 
+    @new_thread("StatsPro")
     def cmd_gen_sum(self, source: CommandSource, context: dict = None) -> None:
         """生成汇总文件"""
         context = context or {}
         note = context.get("note", "")
 
-        self._save_server(source)
+        self._save_server(source, wait=True)
         record = self.gen_service.generate_sum(note)
         self._reply(
             source,
@@ -754,12 +1001,13 @@ class CommandHandler:
             "",
         )
 
+    @new_thread("StatsPro")
     def cmd_gen_record(self, source: CommandSource, context: dict = None) -> None:
         """生成记录"""
         context = context or {}
         note = context.get("note", "")
 
-        self._save_server(source)
+        self._save_server(source, wait=True)
         record = self.gen_service.generate_record(note)
         self._reply(
             source,
@@ -886,20 +1134,82 @@ class CommandHandler:
         else:
             self._reply(source, t("merge.list_output_empty"), "")
 
+    @new_thread("StatsPro")
     def cmd_merge_exec(self, source: CommandSource) -> None:
         """执行合并"""
         if not self._check_permission(source, Permission.HELPER):
             return
 
-        self._save_server(source)
+        self._save_server(source, wait=True)
         success, message = self.merge_service.execute_merge()
-        self._save_server(source)
+        self._save_server(source, wait=True)
 
         if success:
             self._reply(source, message)
         else:
             self._reply(source, t("merge.failed", reason=message))
 
+    def cmd_group_add(self, source: CommandSource, context: dict) -> None:
+        """添加分组成员"""
+        if not self._check_permission(source, Permission.HELPER):
+            return
+
+        group = context["group"]
+        player = context["player"]
+        if self.group_service.add_member(group, player):
+            self._reply(source, t("group.member_added", group=group, player=player))
+        else:
+            self._reply(source, t("group.member_exists", group=group, player=player))
+
+    def cmd_group_del(self, source: CommandSource, context: dict) -> None:
+        """删除分组成员"""
+        if not self._check_permission(source, Permission.HELPER):
+            return
+
+        group = context["group"]
+        player = context["player"]
+        if self.group_service.remove_member(group, player):
+            if player == "all":
+                self._reply(source, t("group.removed", group=group))
+            else:
+                self._reply(source, t("group.member_removed", group=group, player=player))
+        else:
+            self._reply(source, t("group.member_not_found", group=group, player=player))
+
+    def cmd_group_list(self, source: CommandSource) -> None:
+        """列出玩家分组"""
+        groups = self.group_service.get_groups()
+        if not groups:
+            self._reply(source, t("group.list_empty"))
+            return
+
+        self._reply(source, t("group.list_title"), "")
+        for group, members in groups.items():
+            line = RTextList(f"  §a{group}§r ({len(members)}): ")
+            for i, player in enumerate(members):
+                if i > 0:
+                    line.append(", ")
+                line.append(
+                    clickable_text(
+                        player,
+                        hover="点击删除",
+                        command=f"{COMMAND_PREFIX} group del {group} {player}",
+                    )
+                )
+            source.reply(line)
+
+    @new_thread("StatsPro")
+    def cmd_group_sync(self, source: CommandSource) -> None:
+        """从游戏内队伍同步分组"""
+        if not self._check_permission(source, Permission.HELPER):
+            return
+
+        teams = self.group_service.sync_teams(source.get_server())
+        if teams is None:
+            self._reply(source, t("group.sync_unavailable"))
+            return
+        self._reply(source, t("group.synced", count=len(teams)))
+
     def cmd_change(self, source: CommandSource, context: dict) -> None:
         """转移统计数据"""
         if not self._check_permission(source, Permission.HELPER):
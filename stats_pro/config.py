@@ -11,6 +11,7 @@ from pathlib import Path
 from typing import Any
 
 from .constants import (
+    BOT_KEYWORDS,
     COPPER_TOOLS,
     DATA_VERSION_COPPER,
     DATA_VERSION_FUNCTION_FOLDER,
@@ -21,7 +22,7 @@ from .constants import (
     PLUGIN_ID,
     Permission,
 )
-from .models import GenRecord, MergeConfig, Preset
+from .models import GenRecord, MergeConfig, PlayerGroups, Preset
 
 logger = logging.getLogger(PLUGIN_ID)
 
@@ -64,6 +65,10 @@ class PathConfig:
     def uuid_file(self) -> Path:
         return self.config_folder / "uuid.json"
 
+    @property
+    def snapshot_file(self) -> Path:
+        return self.config_folder / "stats_snapshot.bin"
+
     @property
     def usercache_file(self) -> Path:
         return self.server_path / "usercache.json"
@@ -72,17 +77,166 @@ class PathConfig:
         return self.config_folder / mode
 
 
+@dataclass
+class PerformanceConfig:
+    """性能配置"""
+
+    # stats 文件解析并行度：1 为串行，0 为自动（CPU 核心数）
+    parse_workers: int = 1
+    # 并行解析使用的池类型：process / thread
+    parse_executor: str = "thread"
+    # 文件监视器：off / auto / inotify / poll
+    watcher: str = "off"
+    # 轮询模式的检查间隔（秒）
+    watcher_poll_interval: float = 2.0
+    # 是否使用磁盘快照加速启动
+    snapshot: bool = True
+    # 惰性加载：单玩家查询只读取该玩家的文件，排行榜等跨玩家查询时才加载全部
+    lazy_load: bool = False
+    # 惰性加载模式下缓存的玩家数量上限
+    lazy_cache_size: int = 256
+    # 是否启用后台刷新，启用后查询与排行命令直接使用最新快照作答
+    background_refresh: bool = True
+    # 后台定时刷新间隔（秒），0 表示仅在有请求时刷新
+    refresh_interval: float = 30.0
+    # 刷新请求合并窗口（毫秒）
+    refresh_debounce_ms: int = 500
+    # 需要最新数据的命令（如生成计分板）等待刷新完成的最长时间（毫秒）
+    refresh_wait_ms: int = 2000
+    # 发送 save-all 后等待服务端保存完成的最长时间（毫秒）
+    save_wait_ms: int = 5000
+    # 每个结果缓存的内存预算（MB），0 表示只按条目数限制
+    cache_max_mb: float = 0.0
+
+    @property
+    def effective_parse_workers(self) -> int:
+        """实际使用的解析并行度"""
+        if self.parse_workers <= 0:
+            return os.cpu_count() or 1
+        return self.parse_workers
+
+    @property
+    def cache_max_bytes(self) -> int | None:
+        """每个结果缓存的内存预算（字节），不限制时为 None"""
+        if self.cache_max_mb <= 0:
+            return None
+        return int(self.cache_max_mb * 1024 * 1024)
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为配置字典格式"""
+        return {
+            "parse_workers": self.parse_workers,
+            "parse_executor": self.parse_executor,
+            "watcher": self.watcher,
+            "watcher_poll_interval": self.watcher_poll_interval,
+            "snapshot": self.snapshot,
+            "lazy_load": self.lazy_load,
+            "lazy_cache_size": self.lazy_cache_size,
+            "background_refresh": self.background_refresh,
+            "refresh_interval": self.refresh_interval,
+            "refresh_debounce_ms": self.refresh_debounce_ms,
+            "refresh_wait_ms": self.refresh_wait_ms,
+            "save_wait_ms": self.save_wait_ms,
+            "cache_max_mb": self.cache_max_mb,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PerformanceConfig:
+        """从配置字典创建"""
+        default = cls()
+        executor = data.get("parse_executor", default.parse_executor)
+        if executor not in ("process", "thread"):
+            logger.warning(f"Unknown parse_executor: {executor}, using {default.parse_executor}")
+            executor = default.parse_executor
+        watcher = data.get("watcher", default.watcher)
+        if watcher not in ("off", "auto", "inotify", "poll"):
+            logger.warning(f"Unknown watcher mode: {watcher}, using {default.watcher}")
+            watcher = default.watcher
+        return cls(
+            parse_workers=int(data.get("parse_workers", default.parse_workers)),
+            parse_executor=executor,
+            watcher=watcher,
+            watcher_poll_interval=float(
+                data.get("watcher_poll_interval", default.watcher_poll_interval)
+            ),
+            snapshot=bool(data.get("snapshot", default.snapshot)),
+            lazy_load=bool(data.get("lazy_load", default.lazy_load)),
+            lazy_cache_size=max(1, int(data.get("lazy_cache_size", default.lazy_cache_size))),
+            background_refresh=bool(data.get("background_refresh", default.background_refresh)),
+            refresh_interval=max(
+                0.0, float(data.get("refresh_interval", default.refresh_interval))
+            ),
+            refresh_debounce_ms=max(
+                0, int(data.get("refresh_debounce_ms", default.refresh_debounce_ms))
+            ),
+            refresh_wait_ms=max(0, int(data.get("refresh_wait_ms", default.refresh_wait_ms))),
+            save_wait_ms=max(0, int(data.get("save_wait_ms", default.save_wait_ms))),
+            cache_max_mb=max(0.0, float(data.get("cache_max_mb", default.cache_max_mb))),
+        )
+
+
+@dataclass
+class BotRulesConfig:
+    """机器人识别规则"""
+
+    # 名称包含任一关键字（不区分大小写）即视为机器人
+    keywords: list[str] = field(default_factory=lambda: list(BOT_KEYWORDS))
+    # 额外的正则表达式（不区分大小写，部分匹配）
+    patterns: list[str] = field(default_factory=list)
+    # 始终视为真实玩家的名称，优先级最高
+    allow: list[str] = field(default_factory=list)
+    # 始终视为机器人的名称
+    deny: list[str] = field(default_factory=list)
+    # 机器人名单文件（相对 MCDR 根目录），每行一个名称，# 开头为注释
+    tag_files: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为配置字典格式"""
+        return {
+            "keywords": self.keywords,
+            "patterns": self.patterns,
+            "allow": self.allow,
+            "deny": self.deny,
+            "tag_files": self.tag_files,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> BotRulesConfig:
+        """从配置字典创建"""
+        default = cls()
+
+        def str_list(key: str, fallback: list[str]) -> list[str]:
+            value = data.get(key, fallback)
+            if not isinstance(value, list):
+                logger.warning(f"bot_rules.{key} should be a list, using default")
+                return fallback
+            return [str(v) for v in value]
+
+        return cls(
+            keywords=str_list("keywords", default.keywords),
+            patterns=str_list("patterns", default.patterns),
+            allow=str_list("allow", default.allow),
+            deny=str_list("deny", default.deny),
+            tag_files=str_list("tag_files", default.tag_files),
+        )
+
+
 @dataclass
 class PluginConfig:
     """插件配置"""
 
     paths: PathConfig = field(default_factory=PathConfig)
     permission_required: Permission = Permission.HELPER
+    performance: PerformanceConfig = field(default_factory=PerformanceConfig)
+    bot_rules: BotRulesConfig = field(default_factory=BotRulesConfig)
+    # 派生指标 {名称: 表达式}
+    derived_metrics: dict[str, str] = field(default_factory=dict)
 
     # 运行时数据
     presets: dict[str, Preset] = field(default_factory=dict)
     gen_records: dict[str, dict[str, GenRecord]] = field(default_factory=dict)
     merge_config: MergeConfig = field(default_factory=MergeConfig)
+    groups: PlayerGroups = field(default_factory=PlayerGroups)
     _detected_data_version: int | None = None
 
     def __post_init__(self) -> None:
@@ -178,6 +332,26 @@ class PluginConfig:
             output_player=merge_data.get("output", ""),
         )
 
+        # 加载玩家分组
+        groups = data.get("groups", {})
+        if isinstance(groups, dict):
+            self.groups = PlayerGroups.from_dict(groups)
+        else:
+            logger.warning("groups should be an object, ignored")
+
+        # 加载性能配置
+        self.performance = PerformanceConfig.from_dict(data.get("performance", {}))
+
+        # 加载机器人识别规则
+        self.bot_rules = BotRulesConfig.from_dict(data.get("bot_rules", {}))
+
+        # 加载派生指标
+        derived = data.get("derived_metrics", {})
+        if isinstance(derived, dict):
+            self.derived_metrics = {str(k): str(v) for k, v in derived.items()}
+        else:
+            logger.warning("derived_metrics should be an object, ignored")
+
     def _load_defaults(self) -> None:
         """加载默认配置"""
         default_items: dict[str, dict[str, str]] = {"used": {}}
@@ -236,6 +410,10 @@ class PluginConfig:
                 "input": self.merge_config.input_players,
                 "output": self.merge_config.output_player,
             },
+            "groups": self.groups.to_dict(),
+            "performance": self.performance.to_dict(),
+            "bot_rules": self.bot_rules.to_dict(),
+            "derived_metrics": self.derived_metrics,
         }
 
         with open(self.paths.config_file, "w", encoding="utf-8") as f:
@@ -92,4 +92,19 @@ DEFAULT_TOOLS: Final[tuple[str, ...]] = (
     "shears",
 )
 
+# 待解析文件数达到该值时才启用并行解析
+PARALLEL_PARSE_MIN_FILES: Final[int] = 64
+
+# 磁盘快照格式版本，结构变化时递增
+SNAPSHOT_FORMAT_VERSION: Final[int] = 2
+
+# 插件重载时移交给新模块的状态格式版本，结构变化时递增
+HANDOFF_FORMAT_VERSION: Final[int] = 1
+
+# 服务端保存完成时输出的消息
+SAVE_COMPLETE_PATTERN: Final[str] = r"^Saved the (game|world)$"
+
+# 派生指标使用的类别名，如 derived:net_mined
+DERIVED_CATEGORY: Final[str] = "derived"
+
 BOT_KEYWORDS: Final[tuple[str, ...]] = ("bot", "b_", "steve", "alex", "dig")
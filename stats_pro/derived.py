@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""派生指标模块"""
+
+from __future__ import annotations
+
+import logging
+import operator
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, TypeAlias
+
+from .constants import PLUGIN_ID
+from .selectors import compile_selector
+from .store import HAS_NUMPY
+
+if HAS_NUMPY:
+    import numpy as np
+
+logger = logging.getLogger(PLUGIN_ID)
+
+# 词法单元：数值、统计项引用 类别:物品、运算符与括号。
+# 类别须以字母或下划线开头，物品可包含通配符，因此引用后的乘号两侧需留空格
+_TOKEN_RE = re.compile(
+    r"\s*(?:"
+    r"(?P<number>\d+(?:\.\d*)?|\.\d+)"
+    r"|(?P<ref>[A-Za-z_][\w.]*:[\w.*?\[\]]+)"
+    r"|(?P<op>[-+*/()])"
+    r")"
+)
+
+_PY_OPS: dict[str, Callable[[float, float], float]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+}
+
+# 行向量 (数值, 是否存在)
+Vector = tuple[Any, Any]
+
+
+@dataclass(frozen=True)
+class StatRef:
+    """统计项引用，类别与物品可为通配符"""
+
+    category: str
+    item: str
+
+    def __str__(self) -> str:
+        return f"{self.category}:{self.item}"
+
+
+@dataclass(frozen=True)
+class Number:
+    value: float
+
+
+@dataclass(frozen=True)
+class Negate:
+    operand: Node
+
+
+@dataclass(frozen=True)
+class BinaryOp:
+    op: str
+    left: Node
+    right: Node
+
+
+Node: TypeAlias = StatRef | Number | Negate | BinaryOp
+
+
+class _Parser:
+    """递归下降解析器"""
+
+    def __init__(self, text: str):
+        self._tokens = self._tokenize(text)
+        self._pos = 0
+
+    @staticmethod
+    def _tokenize(text: str) -> list[tuple[str, str]]:
+        tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = _TOKEN_RE.match(text, pos)
+            if match is None or match.end() == pos:
+                raise ValueError(f"unexpected character at position {pos}: {text[pos:]!r}")
+            kind = match.lastgroup
+            assert kind is not None
+            tokens.append((kind, match.group(kind)))
+            pos = match.end()
+        return tokens
+
+    def _peek(self) -> str | None:
+        if self._pos < len(self._tokens):
+            return self._tokens[self._pos][1]
+        return None
+
+    def _next(self) -> tuple[str, str]:
+        if self._pos >= len(self._tokens):
+            raise ValueError("unexpected end of expression")
+        token = self._tokens[self._pos]
+        self._pos += 1
+        return token
+
+    def parse(self) -> Node:
+        node = self._expr()
+        if self._pos != len(self._tokens):
+            raise ValueError(f"unexpected token {self._tokens[self._pos][1]!r}")
+        return node
+
+    def _expr(self) -> Node:
+        node = self._term()
+        while self._peek() in ("+", "-"):
+            node = BinaryOp(self._next()[1], node, self._term())
+        return node
+
+    def _term(self) -> Node:
+        node = self._unary()
+        while self._peek() in ("*", "/"):
+            node = BinaryOp(self._next()[1], node, self._unary())
+        return node
+
+    def _unary(self) -> Node:
+        if self._peek() == "-":
+            self._next()
+            return Negate(self._unary())
+        if self._peek() == "+":
+            self._next()
+            return self._unary()
+        return self._primary()
+
+    def _primary(self) -> Node:
+        kind, value = self._next()
+        if kind == "number":
+            return Number(float(value))
+        if kind == "ref":
+            category, item = value.split(":", 1)
+            compile_selector(item)
+            return StatRef(category, item)
+        if value == "(":
+            node = self._expr()
+            if self._next()[1] != ")":
+                raise ValueError("missing closing parenthesis")
+            return node
+        raise ValueError(f"unexpected token {value!r}")
+
+
+def parse_expression(text: str) -> Node:
+    """
+    解析派生指标表达式
+
+    支持 + - * / 、括号、数值常量与 类别:物品 引用（物品可为通配符）
+
+    Raises:
+        ValueError: 表达式无效
+    """
+    try:
+        return _Parser(text).parse()
+    except re.error as e:
+        raise ValueError(f"invalid selector: {e}") from e
+
+
+def _collect_refs(node: Node, refs: dict[StatRef, None]) -> None:
+    if isinstance(node, StatRef):
+        refs[node] = None
+    elif isinstance(node, Negate):
+        _collect_refs(node.operand, refs)
+    elif isinstance(node, BinaryOp):
+        _collect_refs(node.left, refs)
+        _collect_refs(node.right, refs)
+
+
+def _constant(value: float, size: int) -> Vector:
+    if HAS_NUMPY:
+        return np.full(size, value, dtype=np.float64), np.zeros(size, dtype=np.bool_)
+    return [value] * size, bytes(size)
+
+
+def _evaluate(node: Node, vectors: dict[StatRef, Vector], size: int) -> Vector:
+    """逐节点对整列求值，存在掩码为所引用统计项掩码的并集"""
+    if isinstance(node, StatRef):
+        values, present = vectors[node]
+        if HAS_NUMPY:
+            return values.astype(np.float64), present
+        return values, present
+    if isinstance(node, Number):
+        return _constant(node.value, size)
+    if isinstance(node, Negate):
+        values, present = _evaluate(node.operand, vectors, size)
+        if HAS_NUMPY:
+            return -values, present
+        return [-v for v in values], present
+
+    left, left_present = _evaluate(node.left, vectors, size)
+    right, right_present = _evaluate(node.right, vectors, size)
+    if HAS_NUMPY:
+        present = left_present | right_present
+        if node.op == "/":
+            # 除数为 0 时结果记为 0
+            values = np.divide(left, right, out=np.zeros(size, dtype=np.float64), where=right != 0)
+        else:
+            values = {"+": np.add, "-": np.subtract, "*": np.multiply}[node.op](left, right)
+        return values, present
+
+    present = bytes(a | b for a, b in zip(left_present, right_present, strict=True))
+    if node.op == "/":
+        return [a / b if b else 0.0 for a, b in zip(left, right, strict=True)], present
+    op = _PY_OPS[node.op]
+    return [op(a, b) for a, b in zip(left, right, strict=True)], present
+
+
+def normalize_value(value: float) -> int | float:
+    """整数值转为 int，其余保留两位小数"""
+    return int(value) if float(value).is_integer() else round(value, 2)
+
+
+@dataclass(frozen=True)
+class DerivedMetric:
+    """派生指标"""
+
+    name: str
+    expression: str
+    root: Node
+
+    @property
+    def refs(self) -> tuple[StatRef, ...]:
+        """表达式引用的统计项（去重、保持顺序）"""
+        refs: dict[StatRef, None] = {}
+        _collect_refs(self.root, refs)
+        return tuple(refs)
+
+    def evaluate(self, vectors: dict[StatRef, Vector], size: int) -> Vector:
+        """
+        对所有行一次求值
+
+        Args:
+            vectors: 每个引用的行向量 (数值, 是否存在)
+            size: 行数
+
+        Returns:
+            (结果, 是否存在)，至少引用的一项统计存在数值的行视为存在
+        """
+        return _evaluate(self.root, vectors, size)
+
+    def evaluate_stats(self, stats: dict[str, dict[str, int]]) -> int | float | None:
+        """对单份 {category: {item: value}} 数据求值，没有引用的统计项时返回 None"""
+        vectors: dict[StatRef, Vector] = {}
+        for ref in self.refs:
+            category_selector = compile_selector(ref.category)
+            item_selector = compile_selector(ref.item)
+            values = [
+                value
+                for category, items in stats.items()
+                if category_selector.matches(category)
+                for item, value in items.items()
+                if item_selector.matches(item)
+            ]
+            total, present = sum(values), bool(values)
+            if HAS_NUMPY:
+                vectors[ref] = np.array([total], dtype=np.int64), np.array([present])
+            else:
+                vectors[ref] = [total], bytes([present])
+        values, present = self.evaluate(vectors, 1)
+        return normalize_value(values[0]) if present[0] else None
+
+
+def load_derived_metrics(definitions: dict[str, str]) -> dict[str, DerivedMetric]:
+    """解析配置中的派生指标，无效的表达式会被跳过并记录警告"""
+    metrics: dict[str, DerivedMetric] = {}
+    for name, expression in definitions.items():
+        try:
+            metrics[name] = DerivedMetric(name, expression, parse_expression(expression))
+        except ValueError as e:
+            logger.warning(f"Invalid derived metric {name!r}: {e}")
+    return metrics
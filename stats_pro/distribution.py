@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""统计分布计算模块"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+from typing import Any
+
+from .derived import normalize_value
+from .models import StatDistribution
+from .store import HAS_NUMPY
+
+if HAS_NUMPY:
+    import numpy as np
+
+# 默认计算的百分位
+DEFAULT_PERCENTILES: tuple[int, ...] = (50, 90, 99)
+# 默认直方图分桶数
+DEFAULT_BINS = 10
+
+
+def compute_distribution(
+    category: str,
+    item: str,
+    values: Any,
+    percentiles: Sequence[int] = DEFAULT_PERCENTILES,
+    bins: int = DEFAULT_BINS,
+) -> StatDistribution | None:
+    """
+    计算数值分布
+
+    NumPy 可用时对数组整体归约，否则排序后计算；
+    百分位使用线性插值，直方图为 [最小值, 最大值] 上的等宽分桶，与 NumPy 默认行为一致
+
+    Args:
+        category: 类别
+        item: 物品
+        values: 数值数组或列表
+        percentiles: 需要计算的百分位
+        bins: 直方图分桶数
+
+    Returns:
+        分布信息，没有数值时返回 None
+    """
+    count = len(values)
+    if count == 0:
+        return None
+
+    points: list[float]
+    counts: list[int]
+    edges: list[float]
+    if HAS_NUMPY:
+        array = np.asarray(values)
+        total = array.sum().item()
+        minimum = array.min().item()
+        maximum = array.max().item()
+        points = np.percentile(array, percentiles).tolist()
+        bin_counts, bin_edges = np.histogram(array, bins=bins)
+        counts = bin_counts.tolist()
+        edges = bin_edges.tolist()
+    else:
+        ordered = sorted(values)
+        total = sum(ordered)
+        minimum = ordered[0]
+        maximum = ordered[-1]
+        points = [_percentile(ordered, p) for p in percentiles]
+        counts, edges = _histogram(ordered, bins)
+
+    if isinstance(total, float):
+        total = normalize_value(total)
+
+    return StatDistribution(
+        category=category,
+        item=item,
+        count=count,
+        total=total,
+        mean=total / count,
+        minimum=minimum,
+        maximum=maximum,
+        percentiles=dict(zip(percentiles, points, strict=True)),
+        histogram=[(edges[i], edges[i + 1], counts[i]) for i in range(len(counts))],
+    )
+
+
+def _percentile(ordered: Sequence[int], percentile: float) -> float:
+    """有序序列的百分位（线性插值）"""
+    position = (len(ordered) - 1) * percentile / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _histogram(ordered: Sequence[int], bins: int) -> tuple[list[int], list[float]]:
+    """有序序列的等宽直方图，返回 (各桶人数, 边界)"""
+    low, high = float(ordered[0]), float(ordered[-1])
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    width = (high - low) / bins
+    edges = [low + width * i for i in range(bins)] + [high]
+    counts = [0] * bins
+    for value in ordered:
+        # 最后一个桶包含右边界
+        counts[min(int((value - low) / width), bins - 1)] += 1
+    return counts, edges
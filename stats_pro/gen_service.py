@@ -39,6 +39,10 @@ class GenService:
         file_path = self.config.paths.gen_folder("sum") / file_name
 
         summed_stats = self.stats_service.sum_all_stats(players)
+        derived = self.stats_service.evaluate_derived_stats(summed_stats["stats"])
+        if derived:
+            # 汇总结果带有缓存，复制后再附加派生指标
+            summed_stats = {**summed_stats, "derived": derived}
 
         file_path.parent.mkdir(parents=True, exist_ok=True)
         with open(file_path, "w", encoding="utf-8") as f:
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""玩家分组服务"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from .config import PluginConfig
+from .constants import PLUGIN_ID
+from .groups import parse_team_members, parse_team_names
+from .models import PlayerGroups
+
+if TYPE_CHECKING:
+    from mcdreforged.api.all import ServerInterface
+
+logger = logging.getLogger(PLUGIN_ID)
+
+
+class GroupService:
+    """玩家分组服务"""
+
+    def __init__(self, config: PluginConfig):
+        self.config = config
+
+    @property
+    def groups(self) -> PlayerGroups:
+        return self.config.groups
+
+    def add_member(self, group: str, player: str) -> bool:
+        """添加分组成员"""
+        if not self.groups.add_member(group, player):
+            return False
+        self.config.save()
+        return True
+
+    def remove_member(self, group: str, player: str) -> bool:
+        """移除分组成员，player 为 all 时删除整个分组"""
+        if player == "all":
+            result = self.groups.remove_group(group)
+        else:
+            result = self.groups.remove_member(group, player)
+        if result:
+            self.config.save()
+        return result
+
+    def get_groups(self) -> dict[str, list[str]]:
+        """获取所有分组"""
+        return self.groups.to_dict()
+
+    def sync_teams(self, server: ServerInterface) -> dict[str, list[str]] | None:
+        """
+        通过 RCON 读取游戏内队伍并覆盖同名分组
+
+        队伍名取自 /team list 输出中的显示名，与队伍 id 不同的队伍无法查询成员
+
+        Returns:
+            {队伍名: [成员, ...]}，RCON 不可用时返回 None
+        """
+        if not server.is_rcon_running():
+            return None
+
+        teams: dict[str, list[str]] = {}
+        for team in parse_team_names(server.rcon_query("team list")):
+            teams[team] = parse_team_members(server.rcon_query(f"team list {team}"))
+
+        for team, members in teams.items():
+            self.groups.set_group(team, members)
+        if teams:
+            self.config.save()
+        logger.info(f"Synced {len(teams)} team(s) into player groups")
+        return teams
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""玩家分组索引模块"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, cast
+
+from .store import HAS_NUMPY, ColumnarStore
+
+if HAS_NUMPY:
+    import numpy as np
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    from numpy.typing import NDArray
+
+    # 行号或分组 id 序列：NumPy 可用时为数组，否则为列表
+    IndexArray: TypeAlias = NDArray[np.intp] | list[int]
+
+# /team list 的输出："There are 2 team(s): [red], [blue]"
+_TEAM_LIST_RE = re.compile(r"^There (?:are|is) \d+ teams?(?:\(s\))?: (.*)$")
+# /team list <队伍> 的输出："Team [red] has 2 member(s): Alice, Bob"
+_TEAM_MEMBERS_RE = re.compile(r"^Team \[.*\] has \d+ members?(?:\(s\))?: (.*)$")
+
+
+@dataclass(frozen=True)
+class GroupIndex:
+    """
+    玩家→分组索引
+
+    按快照的数据行预先展开为 (行号, 分组 id) 对，分组排行只需对数据列做一次分组归约；
+    快照或分组变化时重建
+    """
+
+    # 构建时的快照版本与分组版本
+    version: int
+    revision: int
+    # 分组名，下标为分组 id
+    names: tuple[str, ...]
+    # (行号, 分组 id) 对，机器人成员的对排在末尾
+    rows: IndexArray
+    group_ids: IndexArray
+    # 非机器人成员的对数
+    n_human: int
+
+    @classmethod
+    def build(
+        cls,
+        version: int,
+        revision: int,
+        groups: dict[str, list[str]],
+        uuid_mapping: dict[str, str],
+        store: ColumnarStore,
+        is_bot: Callable[[str], bool],
+    ) -> GroupIndex:
+        """
+        构建索引
+
+        Args:
+            version: 快照版本
+            revision: 分组版本
+            groups: {分组名: [玩家名, ...]}
+            uuid_mapping: 玩家名到 UUID 的映射
+            store: 快照的列式存储
+            is_bot: 判断玩家名是否为机器人
+        """
+        lowered = {name.lower(): uuid for name, uuid in uuid_mapping.items()}
+        human: dict[tuple[int, int], None] = {}
+        bots: dict[tuple[int, int], None] = {}
+        names = tuple(groups)
+        for group_id, members in enumerate(groups.values()):
+            for name in members:
+                uuid = uuid_mapping.get(name) or lowered.get(name.lower())
+                row = None if uuid is None else store.row_of(uuid)
+                if row is None:
+                    continue
+                (bots if is_bot(name) else human)[(row, group_id)] = None
+
+        # 同一行以真实玩家身份出现过时不再作为机器人重复计入
+        pairs = list(human) + [pair for pair in bots if pair not in human]
+        rows = [row for row, _ in pairs]
+        group_ids = [group_id for _, group_id in pairs]
+        if HAS_NUMPY:
+            return cls(
+                version,
+                revision,
+                names,
+                np.array(rows, dtype=np.intp),
+                np.array(group_ids, dtype=np.intp),
+                len(human),
+            )
+        return cls(version, revision, names, rows, group_ids, len(human))
+
+    def reduce(
+        self, values: Any, present: Any, include_bots: bool = False
+    ) -> dict[str, int | float]:
+        """
+        对覆盖全部行的向量按分组求和
+
+        Args:
+            values: 每行的数值
+            present: 每行是否存在数值
+            include_bots: 是否计入机器人成员
+
+        Returns:
+            {分组名: 成员数值之和}，只包含至少一名成员有数值的分组
+        """
+        n_pairs = len(self.rows) if include_bots else self.n_human
+        n_groups = len(self.names)
+
+        if HAS_NUMPY:
+            rows = cast("NDArray[np.intp]", self.rows)[:n_pairs]
+            group_ids = cast("NDArray[np.intp]", self.group_ids)[:n_pairs]
+            # 只累加存在数值的行，派生指标中的常量不会计入没有数据的成员
+            mask = present[rows]
+            rows, group_ids = rows[mask], group_ids[mask]
+            group_totals = np.zeros(n_groups, dtype=values.dtype)
+            np.add.at(group_totals, group_ids, values[rows])
+            group_present = np.bincount(group_ids, minlength=n_groups) > 0
+            return {
+                self.names[group_id]: group_totals[group_id].item()
+                for group_id in np.flatnonzero(group_present).tolist()
+            }
+
+        totals: list[int | float] = [0] * n_groups
+        has_value = [False] * n_groups
+        for row, group_id in zip(self.rows[:n_pairs], self.group_ids[:n_pairs], strict=True):
+            if present[row]:
+                totals[group_id] += values[row]
+                has_value[group_id] = True
+        return {
+            name: total
+            for name, total, flag in zip(self.names, totals, has_value, strict=True)
+            if flag
+        }
+
+
+def parse_team_names(response: str | None) -> list[str]:
+    """解析 /team list 的输出为队伍名列表"""
+    match = _TEAM_LIST_RE.match((response or "").strip())
+    if match is None:
+        return []
+    return re.findall(r"\[([^\]]*)\]", match.group(1))
+
+
+def parse_team_members(response: str | None) -> list[str]:
+    """解析 /team list <队伍> 的输出为成员列表，队伍为空时返回空列表"""
+    match = _TEAM_MEMBERS_RE.match((response or "").strip())
+    if match is None:
+        return []
+    return [name for name in match.group(1).split(", ") if name]
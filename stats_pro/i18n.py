@@ -117,6 +117,15 @@ ZH_CN_TRANSLATIONS: dict[str, str] = {
     # 排行榜
     "rank.title": "{title}的总和为{total}, 前{count}名如下:",
     "rank.empty": "排行榜为空",
+    "rank.position": "{player}在[§e{category}§r.§b{item}§r]的分数为{score}, 排名第{position}/{total}, 超过了{percentile}%的玩家",
+    "rank.position_not_found": "玩家 {player} 没有 [§e{category}§r.§b{item}§r] 的数据",
+    "selector.invalid": "无效的选择器 {selector}: {error}",
+    "derived.unknown": "未知的派生指标: {name}",
+    "dist.title": "[§e{category}§r.§b{item}§r]共{count}名玩家, 总和为{total}, 平均为{mean}",
+    "dist.summary": "最小值 {min} / {percentiles} / 最大值 {max}",
+    "dist.empty": "没有玩家拥有 [§e{category}§r.§b{item}§r] 的数据",
+    "cache.title": "缓存统计:",
+    "cache.line": "  §a{name}§r: {size}/{max_size} 条, 内存 {memory}, 命中率 {hit_rate}",
     # 预设
     "preset.created": "成功创建预设 {name}, 前缀: {prefix_true}_ / {prefix_dummy}_",
     "preset.removed": "成功删除预设: {name}",
@@ -154,6 +163,15 @@ ZH_CN_TRANSLATIONS: dict[str, str] = {
     "merge.success": "成功将 {inputs} 的数据合并到 {output}",
     "merge.failed": "合并失败: {reason}",
     "merge.empty_config": "输入列表或输出玩家为空",
+    "group.member_added": "成功将 {player} 添加到分组 {group}",
+    "group.member_exists": "{player} 已在分组 {group} 中",
+    "group.member_removed": "成功从分组 {group} 删除 {player}",
+    "group.removed": "成功删除分组 {group}",
+    "group.member_not_found": "分组 {group} 中不存在 {player}",
+    "group.list_title": "玩家分组:",
+    "group.list_empty": "暂无玩家分组",
+    "group.synced": "已从游戏内队伍同步 {count} 个分组",
+    "group.sync_unavailable": "同步队伍需要启用 RCON",
     # 保存
     "save.success": "已重载数据包并保存存档",
     # 旧命令提示
@@ -185,6 +203,15 @@ EN_US_TRANSLATIONS: dict[str, str] = {
     # Ranking
     "rank.title": "{title} total: {total}, top {count}:",
     "rank.empty": "Ranking is empty",
+    "rank.position": "{player} on [§e{category}§r.§b{item}§r]: score {score}, rank {position}/{total}, ahead of {percentile}% of players",
+    "rank.position_not_found": "Player {player} has no data for [§e{category}§r.§b{item}§r]",
+    "selector.invalid": "Invalid selector {selector}: {error}",
+    "derived.unknown": "Unknown derived metric: {name}",
+    "dist.title": "[§e{category}§r.§b{item}§r] {count} players, total {total}, mean {mean}",
+    "dist.summary": "min {min} / {percentiles} / max {max}",
+    "dist.empty": "No player has data for [§e{category}§r.§b{item}§r]",
+    "cache.title": "Cache stats:",
+    "cache.line": "  §a{name}§r: {size}/{max_size} entries, memory {memory}, hit rate {hit_rate}",
     # Preset
     "preset.created": "Created preset {name}, prefix: {prefix_true}_ / {prefix_dummy}_",
     "preset.removed": "Removed preset: {name}",
@@ -222,6 +249,15 @@ EN_US_TRANSLATIONS: dict[str, str] = {
     "merge.success": "Merged {inputs} data into {output}",
     "merge.failed": "Merge failed: {reason}",
     "merge.empty_config": "Input list or output player is empty",
+    "group.member_added": "Added {player} to group {group}",
+    "group.member_exists": "{player} is already in group {group}",
+    "group.member_removed": "Removed {player} from group {group}",
+    "group.removed": "Removed group {group}",
+    "group.member_not_found": "{player} not in group {group}",
+    "group.list_title": "Player groups:",
+    "group.list_empty": "No player groups",
+    "group.synced": "Synced {count} group(s) from in-game teams",
+    "group.sync_unavailable": "RCON is required to sync teams",
     # Save
     "save.success": "Reloaded datapacks and saved world",
     # Legacy command
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""stats 文件加载模块"""
+
+from __future__ import annotations
+
+import json
+import logging
+import marshal
+import multiprocessing
+import os
+import pickle
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any
+
+from .constants import PARALLEL_PARSE_MIN_FILES, PLUGIN_ID, SNAPSHOT_FORMAT_VERSION
+from .models import FileState
+
+logger = logging.getLogger(PLUGIN_ID)
+
+# (DataVersion, stats, 错误信息)
+ParseResult = tuple[int | None, dict[str, dict[str, int]] | None, str | None]
+
+
+def parse_stats_file(path: str) -> ParseResult:
+    """
+    解析单个 stats 文件
+
+    作为进程池任务使用，因此不抛出异常，而是将错误信息作为结果返回
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data: dict[str, Any] = json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+        return None, None, str(e)
+    return data.get("DataVersion"), data.get("stats", {}), None
+
+
+def _create_executor(kind: str, workers: int) -> Executor:
+    """创建解析用的线程池或进程池"""
+    if kind == "thread":
+        return ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="StatsPro-Parse"
+        )
+    # MCDR 进程中有多个线程，fork 可能复制被其他线程持有的锁而使子进程死锁
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def parse_stats_files(
+    paths: list[str],
+    workers: int = 1,
+    executor: str = "thread",
+) -> list[ParseResult]:
+    """
+    批量解析 stats 文件
+
+    文件数量达到阈值且 workers > 1 时使用线程池或进程池并行解析，
+    结果顺序与 paths 一致；并行解析失败时回退为串行解析
+
+    Args:
+        paths: 文件路径列表
+        workers: 并行度
+        executor: 池类型，process 或 thread
+    """
+    if workers > 1 and len(paths) >= PARALLEL_PARSE_MIN_FILES:
+        chunksize = max(1, len(paths) // (workers * 4))
+        try:
+            with _create_executor(executor, workers) as pool:
+                return list(pool.map(parse_stats_file, paths, chunksize=chunksize))
+        except (BrokenProcessPool, OSError, pickle.PicklingError) as e:
+            logger.warning(f"Parallel stats parsing failed, falling back to serial: {e}")
+
+    return [parse_stats_file(path) for path in paths]
+
+
+def dump_parsed_stats(
+    path: Path,
+    file_states: dict[str, FileState],
+    store_state: dict[str, Any],
+) -> None:
+    """
+    将已解析的统计数据写入磁盘快照
+
+    快照记录每个 stats 文件的 (mtime_ns, size, inode) 与列式存储的导出结果，
+    使用 marshal 序列化，仅包含内置类型
+
+    Args:
+        path: 快照文件路径
+        file_states: {uuid: FileState}
+        store_state: ColumnarStore.export_state 的结果
+    """
+    states = {
+        uuid: (state.mtime_ns, state.size, state.inode)
+        for uuid, state in file_states.items()
+    }
+    payload = marshal.dumps(
+        (SNAPSHOT_FORMAT_VERSION, tuple(sys.version_info[:2]), states, store_state)
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def load_parsed_stats(
+    path: Path,
+) -> tuple[dict[str, FileState], dict[str, Any]] | None:
+    """
+    读取磁盘快照
+
+    格式版本或 Python 版本不匹配、文件损坏时返回 None
+
+    Returns:
+        ({uuid: FileState}, 列式存储导出结果)
+    """
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            format_version, py_version, states, store_state = marshal.load(f)
+    except (EOFError, ValueError, TypeError, OSError) as e:
+        logger.warning(f"Failed to load stats snapshot: {e}")
+        return None
+
+    if format_version != SNAPSHOT_FORMAT_VERSION or tuple(py_version) != tuple(sys.version_info[:2]):
+        logger.info("Stats snapshot format changed, ignoring it")
+        return None
+
+    try:
+        file_states = {
+            uuid: FileState(mtime_ns, size, inode)
+            for uuid, (mtime_ns, size, inode) in states.items()
+        }
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning(f"Stats snapshot is corrupted: {e}")
+        return None
+    return file_states, store_state
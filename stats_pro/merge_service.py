@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING
 from .config import PluginConfig
 from .constants import PLUGIN_ID
 from .models import PlayerStats
+from .registry import get_key_registry
 from .stats_service import StatsService
 
 if TYPE_CHECKING:
@@ -109,22 +110,18 @@ class MergeService:
         self, stats_list: list[PlayerStats]
     ) -> dict:
         """合并多个玩家的统计数据"""
-        merged_stats: dict[str, dict[str, int]] = {}
+        registry = get_key_registry()
+        merged_stats: dict[int, int] = {}
         data_version = None
 
         for player_stats in stats_list:
             if player_stats.data_version is not None:
                 data_version = player_stats.data_version
 
-            for category, items in player_stats.stats.items():
-                if category not in merged_stats:
-                    merged_stats[category] = {}
-                for item, value in items.items():
-                    merged_stats[category][item] = (
-                        merged_stats[category].get(item, 0) + value
-                    )
+            for key_id, value in registry.encode(player_stats.stats).items():
+                merged_stats[key_id] = merged_stats.get(key_id, 0) + value
 
-        result = {"stats": merged_stats}
+        result = {"stats": registry.decode(merged_stats)}
         if data_version is not None:
             result["DataVersion"] = data_version
         return result
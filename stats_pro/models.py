@@ -4,11 +4,26 @@
 from __future__ import annotations
 
 import json
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 
+@dataclass(frozen=True)
+class FileState:
+    """文件状态，用于判断 stats 文件是否发生变化"""
+
+    mtime_ns: int
+    size: int
+    inode: int
+
+    @classmethod
+    def from_stat(cls, st: os.stat_result) -> FileState:
+        """从 os.stat 结果构建"""
+        return cls(mtime_ns=st.st_mtime_ns, size=st.st_size, inode=st.st_ino)
+
+
 @dataclass
 class PlayerStats:
     """玩家统计数据模型"""
@@ -62,6 +77,98 @@ class PlayerStats:
         return result
 
 
+@dataclass
+class RankPosition:
+    """玩家在某项统计中的排名"""
+
+    player: str
+    category: str
+    item: str
+    # 派生指标的分数可为小数
+    score: int | float
+    # 名次，从 1 开始，同分玩家名次相同
+    position: int
+    # 参与排名的玩家数
+    total: int
+    # 分数严格低于该玩家的参与者比例（百分比）
+    percentile: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "player": self.player,
+            "category": self.category,
+            "item": self.item,
+            "score": self.score,
+            "position": self.position,
+            "total": self.total,
+            "percentile": self.percentile,
+        }
+
+
+@dataclass
+class StatDistribution:
+    """某项统计在玩家间的分布"""
+
+    category: str
+    item: str
+    # 拥有该统计的玩家数
+    count: int
+    # 派生指标的总和与极值可为小数
+    total: float
+    mean: float
+    minimum: float
+    maximum: float
+    # {百分位: 数值}，线性插值
+    percentiles: dict[int, float] = field(default_factory=dict)
+    # 等宽直方图 [(下界, 上界, 人数), ...]
+    histogram: list[tuple[float, float, int]] = field(default_factory=list)
+
+    @property
+    def median(self) -> float:
+        return self.percentiles.get(50, float("nan"))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "category": self.category,
+            "item": self.item,
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "min": self.minimum,
+            "max": self.maximum,
+            "percentiles": {str(p): v for p, v in self.percentiles.items()},
+            "histogram": [list(bucket) for bucket in self.histogram],
+        }
+
+
+@dataclass
+class MetricRankings:
+    """多项统计的排行数据"""
+
+    # [(类别, 物品), ...]，可包含选择器
+    metrics: list[tuple[str, str]]
+    # {(类别, 物品): {玩家名: 分数}}
+    scores: dict[tuple[str, str], dict[str, int]] = field(default_factory=dict)
+    # {玩家名: 所有统计项的总和}
+    totals: dict[str, int] = field(default_factory=dict)
+
+    def ranking(self, category: str, item: str, limit: int | None = None) -> dict[str, int]:
+        """某项统计按分数降序、同分按名称排序的 {玩家名: 分数}"""
+        scores = self.scores.get((category, item), {})
+        return dict(sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:limit])
+
+    def total_ranking(self, limit: int | None = None) -> dict[str, int]:
+        """按总和降序、同分按名称排序的 {玩家名: 总和}"""
+        return dict(sorted(self.totals.items(), key=lambda kv: (-kv[1], kv[0]))[:limit])
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "metrics": [list(metric) for metric in self.metrics],
+            "scores": [self.scores.get(metric, {}) for metric in self.metrics],
+            "totals": self.totals,
+        }
+
+
 @dataclass
 class Preset:
     """预设配置模型"""
@@ -180,6 +287,62 @@ class MergeConfig:
         return bool(self.input_players and self.output_player)
 
 
+@dataclass
+class PlayerGroups:
+    """玩家分组模型"""
+
+    # {分组名: [玩家名, ...]}
+    groups: dict[str, list[str]] = field(default_factory=dict)
+    # 每次修改后递增，用于判断成员索引是否需要重建
+    revision: int = 0
+
+    def add_member(self, group: str, player: str) -> bool:
+        members = self.groups.setdefault(group, [])
+        if player in members:
+            return False
+        members.append(player)
+        self.revision += 1
+        return True
+
+    def remove_member(self, group: str, player: str) -> bool:
+        """移除成员，分组为空时一并删除"""
+        members = self.groups.get(group)
+        if members is None or player not in members:
+            return False
+        members.remove(player)
+        if not members:
+            del self.groups[group]
+        self.revision += 1
+        return True
+
+    def remove_group(self, group: str) -> bool:
+        if group not in self.groups:
+            return False
+        del self.groups[group]
+        self.revision += 1
+        return True
+
+    def set_group(self, group: str, players: list[str]) -> None:
+        """整体替换分组成员，成员为空时删除分组"""
+        players = list(dict.fromkeys(players))
+        if players:
+            self.groups[group] = players
+        else:
+            self.groups.pop(group, None)
+        self.revision += 1
+
+    def to_dict(self) -> dict[str, list[str]]:
+        return {group: list(members) for group, members in self.groups.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PlayerGroups:
+        groups: dict[str, list[str]] = {}
+        for group, members in data.items():
+            if isinstance(members, list) and members:
+                groups[str(group)] = list(dict.fromkeys(str(m) for m in members))
+        return cls(groups=groups)
+
+
 def _ensure_prefix(value: str) -> str:
     """确保值带有 minecraft: 前缀"""
     if value.startswith("minecraft:"):
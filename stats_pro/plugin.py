@@ -4,17 +4,20 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+import threading
+from typing import TYPE_CHECKING, Any
 
 from .config import PluginConfig
 from .constants import PLUGIN_ID
 from .gen_service import GenService
+from .group_service import GroupService
 from .merge_service import MergeService
+from .save_coordinator import SaveCoordinator
 from .scoreboard_service import ScoreboardService
 from .stats_service import StatsService
 
 if TYPE_CHECKING:
-    from mcdreforged.api.all import PluginServerInterface
+    from mcdreforged.api.all import Info, PluginServerInterface
 
 logger = logging.getLogger(PLUGIN_ID)
 
@@ -28,6 +31,10 @@ class StatsProPlugin:
         self._scoreboard_service: ScoreboardService | None = None
         self._gen_service: GenService | None = None
         self._merge_service: MergeService | None = None
+        self._group_service: GroupService | None = None
+        self._save_coordinator: SaveCoordinator | None = None
+        # 加载后在后台更新快照的线程，重载前的实例与新实例写入同一快照文件
+        self._snapshot_saver: threading.Thread | None = None
         self._initialized = False
 
     @property
@@ -60,8 +67,27 @@ class StatsProPlugin:
             raise RuntimeError("Plugin not initialized")
         return self._merge_service
 
-    def initialize(self, server: PluginServerInterface) -> None:
-        """初始化插件"""
+    @property
+    def group_service(self) -> GroupService:
+        if self._group_service is None:
+            raise RuntimeError("Plugin not initialized")
+        return self._group_service
+
+    @property
+    def save_coordinator(self) -> SaveCoordinator:
+        if self._save_coordinator is None:
+            raise RuntimeError("Plugin not initialized")
+        return self._save_coordinator
+
+    def initialize(
+        self, server: PluginServerInterface, handoff: dict[str, Any] | None = None
+    ) -> None:
+        """
+        初始化插件
+
+        Args:
+            handoff: 重载前的插件实例通过 export_state 导出的状态
+        """
         if self._initialized:
             logger.warning("Plugin already initialized")
             return
@@ -71,14 +97,10 @@ class StatsProPlugin:
         self._config = PluginConfig.load()
         self._config.save()
 
-        self._stats_service = StatsService(self._config)
-        self._scoreboard_service = ScoreboardService(
-            self._config, self._stats_service
-        )
-        self._gen_service = GenService(self._config, self._stats_service)
-        self._merge_service = MergeService(self._config, self._stats_service)
-
-        self._stats_service.reload_all_stats()
+        self._create_services(handoff)
+        self._load_stats(handoff)
+        self.stats_service.start_watcher()
+        self.stats_service.start_refresher()
 
         self._initialized = True
         logger.info("StatsPro plugin initialized successfully")
@@ -90,12 +112,32 @@ class StatsProPlugin:
 
         logger.info("Shutting down StatsPro plugin...")
 
+        if self._stats_service:
+            self._stats_service.stop_watcher()
+            self._stats_service.stop_refresher()
+            self._join_snapshot_saver()
+            if self._config and self._config.performance.snapshot:
+                self._stats_service.save_snapshot()
+
         if self._config:
             self._config.save()
 
         self._initialized = False
         logger.info("StatsPro plugin shut down")
 
+    def export_state(self) -> dict[str, Any] | None:
+        """
+        导出已解析的统计数据、索引与缓存，供重载后的插件实例接管
+
+        需在 shutdown 之后调用，此时文件监视器与后台刷新均已停止
+
+        Returns:
+            移交状态，未加载全部数据时返回 None
+        """
+        if self._stats_service is None:
+            return None
+        return self._stats_service.export_state()
+
     def reload(self) -> None:
         """重载插件配置"""
         if not self._initialized:
@@ -104,14 +146,81 @@ class StatsProPlugin:
 
         logger.info("Reloading StatsPro configuration...")
 
+        handoff = None
+        if self._stats_service:
+            self._stats_service.stop_watcher()
+            self._stats_service.stop_refresher()
+            self._join_snapshot_saver()
+            if self.config.performance.snapshot:
+                self._stats_service.save_snapshot()
+            handoff = self._stats_service.export_state()
+
         self._config = PluginConfig.load()
-        self._stats_service = StatsService(self._config)
+        self._create_services(handoff)
+        self._load_stats(handoff)
+        self.stats_service.start_watcher()
+        self.stats_service.start_refresher()
+
+        logger.info("StatsPro configuration reloaded")
+
+    def on_info(self, info: Info) -> None:
+        """处理服务端输出"""
+        if self._initialized and self._save_coordinator is not None:
+            self._save_coordinator.on_info(info)
+
+    def _create_services(self, handoff: dict[str, Any] | None = None) -> None:
+        """根据当前配置创建各服务，handoff 为重载前的实例导出的状态"""
+        self._stats_service = StatsService(self.config, handoff=handoff)
         self._scoreboard_service = ScoreboardService(
-            self._config, self._stats_service
+            self.config, self._stats_service
+        )
+        self._gen_service = GenService(self.config, self._stats_service)
+        self._merge_service = MergeService(self.config, self._stats_service)
+        self._group_service = GroupService(self.config)
+        self._save_coordinator = SaveCoordinator(
+            self._stats_service.request_refresh,
+            timeout=self.config.performance.save_wait_ms / 1000,
         )
-        self._gen_service = GenService(self._config, self._stats_service)
-        self._merge_service = MergeService(self._config, self._stats_service)
 
-        self._stats_service.reload_all_stats()
+    def _load_stats(self, handoff: dict[str, Any] | None = None) -> None:
+        """
+        加载统计数据
 
-        logger.info("StatsPro configuration reloaded")
+        优先接管重载前的实例移交的数据，其次使用磁盘快照，
+        两者均仅重新解析之后变化的文件；惰性加载模式下不预先加载
+
+        Args:
+            handoff: 重载前的实例导出的状态
+        """
+        stats_service = self.stats_service
+        performance = self.config.performance
+        if performance.lazy_load:
+            logger.info("Lazy loading enabled, stats will be loaded on demand")
+            return
+
+        use_snapshot = performance.snapshot
+
+        if handoff is not None and stats_service.import_state(handoff):
+            stats_service.refresh_stats()
+        elif use_snapshot and stats_service.load_snapshot():
+            stats_service.refresh_stats()
+        else:
+            stats_service.reload_all_stats()
+
+        reparsed = stats_service.last_reload_count
+        logger.info(f"Stats loaded, {reparsed} file(s) parsed")
+
+        # 在后台更新快照，不阻塞插件加载
+        if use_snapshot and reparsed:
+            self._snapshot_saver = threading.Thread(
+                target=stats_service.save_snapshot,
+                name="StatsPro-Snapshot",
+                daemon=True,
+            )
+            self._snapshot_saver.start()
+
+    def _join_snapshot_saver(self) -> None:
+        """等待后台快照保存结束，避免与之后的保存同时写入临时文件"""
+        if self._snapshot_saver is not None:
+            self._snapshot_saver.join()
+            self._snapshot_saver = None
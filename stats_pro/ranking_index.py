@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""排行索引模块"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterable
+from itertools import islice
+from threading import Lock
+
+from .store import ColumnarStore
+
+# 排行条目 (-分数, 玩家名)，升序即为分数降序、同分按名称排序
+RankEntry = tuple[int, str]
+
+
+def _discard(entries: list[RankEntry], entry: RankEntry) -> None:
+    """从有序列表中移除条目"""
+    index = bisect_left(entries, entry)
+    if index < len(entries) and entries[index] == entry:
+        del entries[index]
+
+
+class RankingIndex:
+    """
+    (类别, 物品) 排行索引
+
+    每个键维护两个按 (-分数, 玩家名) 排序的列表：全部玩家与排除机器人后的玩家。
+    列表在首次查询时构建，之后随快照发布移交给新索引并原地增量更新；
+    同一索引链共享一把锁，读取与更新互斥
+    """
+
+    def __init__(
+        self,
+        rankings: dict[int, tuple[list[RankEntry], list[RankEntry]]] | None = None,
+        lock: Lock | None = None,
+    ):
+        self._rankings = rankings if rankings is not None else {}
+        self._lock = lock or Lock()
+
+    def __len__(self) -> int:
+        """已构建索引的键数量"""
+        return len(self._rankings)
+
+    def __contains__(self, key_id: object) -> bool:
+        return key_id in self._rankings
+
+    def export_state(self) -> dict[int, tuple[list[RankEntry], list[RankEntry]]]:
+        """已构建条目的副本 {键 id: (全部玩家, 排除机器人)}"""
+        with self._lock:
+            return {
+                key_id: (list(entries), list(humans))
+                for key_id, (entries, humans) in self._rankings.items()
+            }
+
+    def _entries(
+        self,
+        key_id: int,
+        include_bots: bool,
+        store: ColumnarStore,
+        names_by_uuid: dict[str, tuple[str, ...]],
+        is_bot: Callable[[str], bool],
+    ) -> list[RankEntry]:
+        """获取某键的有序条目，未构建时先构建，调用方需持有锁"""
+        ranking = self._rankings.get(key_id)
+        if ranking is None:
+            ranking = self._rankings[key_id] = self._build(key_id, store, names_by_uuid, is_bot)
+        return ranking[0] if include_bots else ranking[1]
+
+    def top(
+        self,
+        key_id: int,
+        limit: int,
+        include_bots: bool,
+        store: ColumnarStore,
+        names_by_uuid: dict[str, tuple[str, ...]],
+        is_bot: Callable[[str], bool],
+    ) -> list[tuple[str, int]]:
+        """前 limit 名 [(玩家名, 分数), ...]"""
+        with self._lock:
+            entries = self._entries(key_id, include_bots, store, names_by_uuid, is_bot)
+            return [(name, -score) for score, name in islice(entries, limit)]
+
+    def position(
+        self,
+        key_id: int,
+        score: int,
+        include_bots: bool,
+        store: ColumnarStore,
+        names_by_uuid: dict[str, tuple[str, ...]],
+        is_bot: Callable[[str], bool],
+    ) -> tuple[int, int, int]:
+        """
+        二分查找某分数在排行中的位置
+
+        Returns:
+            (分数更高的人数, 分数不低于该分数的人数, 总人数)
+        """
+        with self._lock:
+            entries = self._entries(key_id, include_bots, store, names_by_uuid, is_bot)
+            # 条目按 (-分数, 名称) 排序，长度为 1 的元组排在同分条目之前
+            higher = bisect_left(entries, (-score,))
+            not_lower = bisect_left(entries, (-score + 1,))
+            return higher, not_lower, len(entries)
+
+    @staticmethod
+    def _build(
+        key_id: int,
+        store: ColumnarStore,
+        names_by_uuid: dict[str, tuple[str, ...]],
+        is_bot: Callable[[str], bool],
+    ) -> tuple[list[RankEntry], list[RankEntry]]:
+        """扫描数据列构建某键的有序条目"""
+        uuids, values = store.column_entries(key_id)
+        entries = sorted(
+            (-value, name)
+            for uuid, value in zip(uuids, values, strict=True)
+            for name in names_by_uuid.get(uuid, ())
+        )
+        humans = [entry for entry in entries if not is_bot(entry[1])]
+        return entries, humans
+
+    def evolve(
+        self,
+        old_store: ColumnarStore,
+        new_store: ColumnarStore,
+        uuids: Iterable[str],
+        names_by_uuid: dict[str, tuple[str, ...]],
+        is_bot: Callable[[str], bool],
+    ) -> RankingIndex:
+        """
+        基于存储变化构建新索引
+
+        已构建的列表移交给新索引，仅对 uuids 中玩家在这些键上的条目原地删除与插入，
+        每个条目的定位为 O(log n)，不复制整个列表；
+        移交后本索引清空，仍持有旧快照的读取方将按需从旧存储重建。
+        要求新旧快照的 UUID 映射相同
+
+        Args:
+            old_store: 旧存储
+            new_store: 新存储
+            uuids: 数据发生变化的玩家
+            names_by_uuid: {uuid: 玩家名}
+            is_bot: 判断玩家名是否为机器人
+        """
+        with self._lock:
+            rankings = self._rankings
+            self._rankings = {}
+
+            for uuid in uuids:
+                names = names_by_uuid.get(uuid, ())
+                if not names:
+                    continue
+                key_ids = {*old_store.row_key_ids(uuid), *new_store.row_key_ids(uuid)}
+                for key_id in key_ids:
+                    ranking = rankings.get(key_id)
+                    if ranking is None:
+                        continue
+                    old_value = old_store.value(uuid, key_id)
+                    new_value = new_store.value(uuid, key_id)
+                    if old_value == new_value:
+                        continue
+
+                    for name in names:
+                        targets = ranking if not is_bot(name) else ranking[:1]
+                        for entries in targets:
+                            if old_value is not None:
+                                _discard(entries, (-old_value, name))
+                            if new_value is not None:
+                                insort(entries, (-new_value, name))
+
+        return RankingIndex(rankings, self._lock)
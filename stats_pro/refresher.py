@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""后台刷新调度模块"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable
+
+from .constants import PLUGIN_ID
+
+logger = logging.getLogger(PLUGIN_ID)
+
+
+class StatsRefresher:
+    """
+    后台统计数据刷新调度器
+
+    在后台线程中按固定间隔执行刷新；短时间内的多次刷新请求会被合并为一次
+    （防抖），命令线程可通过 refresh_now 等待一次新的刷新完成
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[], object],
+        interval: float = 30.0,
+        debounce: float = 0.5,
+    ):
+        """
+        初始化刷新调度器
+
+        Args:
+            refresh: 刷新回调
+            interval: 定时刷新间隔（秒），0 表示仅在请求时刷新
+            debounce: 请求合并窗口（秒）
+        """
+        self._refresh = refresh
+        self._interval = interval
+        self._debounce = debounce
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        # 请求与完成的代数，完成代数达到请求代数即表示请求已被满足
+        self._requested = 0
+        self._completed = 0
+        self._urgent = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """启动刷新线程"""
+        if self.is_running:
+            return True
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="StatsPro-Refresher", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Stats refresher started (interval {self._interval}s)")
+        return True
+
+    def stop(self) -> None:
+        """停止刷新线程"""
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def request(self, urgent: bool = False) -> int:
+        """
+        请求一次刷新，不等待完成
+
+        Args:
+            urgent: 是否跳过防抖窗口立即刷新
+
+        Returns:
+            本次请求的代数
+        """
+        with self._cond:
+            self._requested += 1
+            self._urgent = self._urgent or urgent
+            self._cond.notify_all()
+            return self._requested
+
+    def refresh_now(self, timeout_ms: int | None = None) -> bool:
+        """
+        请求立即刷新并等待完成
+
+        刷新线程未运行时在当前线程同步刷新
+
+        Args:
+            timeout_ms: 最长等待时间（毫秒），None 表示一直等待
+
+        Returns:
+            是否在超时前完成
+        """
+        if not self.is_running:
+            self._run_refresh()
+            return True
+
+        generation = self.request(urgent=True)
+        timeout = None if timeout_ms is None else timeout_ms / 1000
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._completed >= generation or self._stop_event.is_set(),
+                timeout=timeout,
+            )
+
+    def _run_refresh(self) -> None:
+        """执行刷新回调，异常不会终止刷新线程"""
+        try:
+            self._refresh()
+        except Exception:
+            logger.exception("Background stats refresh failed")
+
+    def _loop(self) -> None:
+        """刷新循环"""
+        interval = self._interval if self._interval > 0 else None
+        while not self._stop_event.is_set():
+            with self._cond:
+                if self._completed >= self._requested:
+                    self._cond.wait(timeout=interval)
+                if self._stop_event.is_set():
+                    break
+                if self._completed >= self._requested:
+                    # 定时刷新
+                    self._requested += 1
+                urgent = self._urgent
+
+            # 防抖：等待窗口内的后续请求，一并由本次刷新满足
+            with self._cond:
+                if not urgent and self._debounce > 0:
+                    self._cond.wait_for(
+                        lambda: self._urgent or self._stop_event.is_set(),
+                        timeout=self._debounce,
+                    )
+                if self._stop_event.is_set():
+                    break
+                generation = self._requested
+                self._urgent = False
+
+            self._run_refresh()
+
+            with self._cond:
+                self._completed = generation
+                self._cond.notify_all()
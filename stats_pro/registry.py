@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""键字典模块"""
+
+from __future__ import annotations
+
+import sys
+from threading import Lock
+
+from .utils import strip_prefix
+
+# 编码后的统计数据 {键 id: 数值}
+EncodedStats = dict[int, int]
+
+
+class KeyRegistry:
+    """
+    进程级键字典
+
+    将类别、物品与玩家名驻留为唯一的字符串实例，并分配稳定的小整数 id。
+    id 只增不减，在进程生命周期内保持不变
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        # (类别, 物品) 键
+        self._key_ids: dict[tuple[str, str], int] = {}
+        # {类别: {物品: 键 id}}，编码时按类别查找，无需为每个数值构建元组
+        self._nested_ids: dict[str, dict[str, int]] = {}
+        self._keys: list[tuple[str, str]] = []
+        self._short_keys: list[tuple[str, str]] = []
+        self._category_keys: dict[str, list[int]] = {}
+        # 倒排索引 {物品: [键 id, ...]}
+        self._item_keys: dict[str, list[int]] = {}
+        # 玩家名
+        self._player_ids: dict[str, int] = {}
+        self._players: list[str] = []
+
+    def __len__(self) -> int:
+        """已分配的键数量"""
+        return len(self._keys)
+
+    # ---------- (类别, 物品) 键 ----------
+
+    def intern_key(self, category: str, item: str) -> int:
+        """获取或分配 (类别, 物品) 的键 id"""
+        key_id = self._key_ids.get((category, item))
+        if key_id is not None:
+            return key_id
+        with self._lock:
+            key = (sys.intern(category), sys.intern(item))
+            key_id = self._key_ids.get(key)
+            if key_id is None:
+                key_id = len(self._keys)
+                self._keys.append(key)
+                self._short_keys.append((strip_prefix(key[0]), strip_prefix(key[1])))
+                self._category_keys.setdefault(key[0], []).append(key_id)
+                self._item_keys.setdefault(key[1], []).append(key_id)
+                self._nested_ids.setdefault(key[0], {})[key[1]] = key_id
+                self._key_ids[key] = key_id
+            return key_id
+
+    def key_id(self, category: str, item: str) -> int | None:
+        """获取 (类别, 物品) 的键 id，不存在时返回 None"""
+        return self._key_ids.get((category, item))
+
+    def key(self, key_id: int) -> tuple[str, str]:
+        """根据键 id 获取 (类别, 物品)"""
+        return self._keys[key_id]
+
+    def short_key(self, key_id: int) -> tuple[str, str]:
+        """根据键 id 获取去除 minecraft: 前缀的 (类别, 物品)"""
+        return self._short_keys[key_id]
+
+    def category_key_ids(self, category: str) -> list[int]:
+        """某类别下所有键 id"""
+        return list(self._category_keys.get(category, ()))
+
+    def item_key_ids(self, item: str) -> list[int]:
+        """某物品在所有类别中的键 id"""
+        return list(self._item_keys.get(item, ()))
+
+    # ---------- 玩家名 ----------
+
+    def intern_player(self, name: str) -> int:
+        """获取或分配玩家名 id"""
+        player_id = self._player_ids.get(name)
+        if player_id is not None:
+            return player_id
+        with self._lock:
+            player_id = self._player_ids.get(name)
+            if player_id is None:
+                player_id = len(self._players)
+                self._players.append(sys.intern(name))
+                self._player_ids[self._players[player_id]] = player_id
+            return player_id
+
+    def player_id(self, name: str) -> int | None:
+        """获取玩家名 id，不存在时返回 None"""
+        return self._player_ids.get(name)
+
+    def player_name(self, player_id: int) -> str:
+        """根据 id 获取玩家名"""
+        return self._players[player_id]
+
+    # ---------- 重载移交 ----------
+
+    def export_state(self) -> dict[str, list]:
+        """导出已分配的键与玩家名，下标即为 id"""
+        with self._lock:
+            return {"keys": list(self._keys), "players": list(self._players)}
+
+    def import_state(self, state: dict[str, list]) -> bool:
+        """
+        按原顺序驻留导出的键与玩家名，使 id 与导出方一致
+
+        Returns:
+            id 是否与导出方一致，已分配的 id 与导出内容冲突时为 False
+        """
+        keys = [tuple(key) for key in state["keys"]]
+        players = list(state["players"])
+        if self._keys != keys[:len(self._keys)] or self._players != players[:len(self._players)]:
+            return False
+        for category, item in keys:
+            self.intern_key(category, item)
+        for name in players:
+            self.intern_player(name)
+        return True
+
+    # ---------- 编解码 ----------
+
+    def encode(self, stats: dict[str, dict[str, int]]) -> EncodedStats:
+        """将 {category: {item: value}} 编码为 {键 id: 数值}，跳过非法数值"""
+        result: EncodedStats = {}
+        intern_key = self.intern_key
+        nested_ids = self._nested_ids
+        for category, items in stats.items():
+            if not isinstance(items, dict):
+                continue
+            item_ids = nested_ids.get(category, {})
+            for item, value in items.items():
+                key_id = item_ids.get(item)
+                if key_id is None:
+                    key_id = intern_key(category, item)
+                if type(value) is not int:
+                    try:
+                        value = int(value)
+                    except (TypeError, ValueError, OverflowError):
+                        continue
+                result[key_id] = value
+        return result
+
+    def decode(self, encoded: EncodedStats) -> dict[str, dict[str, int]]:
+        """将 {键 id: 数值} 解码为 {category: {item: value}}"""
+        result: dict[str, dict[str, int]] = {}
+        keys = self._keys
+        for key_id, value in encoded.items():
+            category, item = keys[key_id]
+            result.setdefault(category, {})[item] = value
+        return result
+
+
+# 全局键字典实例
+_key_registry: KeyRegistry | None = None
+
+
+def get_key_registry() -> KeyRegistry:
+    """获取全局键字典实例"""
+    global _key_registry
+    if _key_registry is None:
+        _key_registry = KeyRegistry()
+    return _key_registry
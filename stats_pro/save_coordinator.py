@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""存档保存协调模块"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+from .constants import PLUGIN_ID, SAVE_COMPLETE_PATTERN
+
+if TYPE_CHECKING:
+    from mcdreforged.api.all import Info, ServerInterface
+
+logger = logging.getLogger(PLUGIN_ID)
+
+_SAVE_COMPLETE_RE = re.compile(SAVE_COMPLETE_PATTERN)
+
+
+class SaveCoordinator:
+    """
+    存档保存协调器
+
+    多个命令同时请求保存时只发送一次 save-all；通过 on_info 捕获服务端输出的
+    "Saved the game" 判断保存完成，并在保存完成后触发增量刷新
+    """
+
+    def __init__(self, on_saved: Callable[[], object], timeout: float = 5.0):
+        """
+        初始化保存协调器
+
+        Args:
+            on_saved: 保存完成回调（用于触发增量刷新）
+            timeout: 等待保存完成的最长时间（秒），超时后视为保存已丢失
+        """
+        self._on_saved = on_saved
+        self._timeout = timeout
+        self._cond = threading.Condition()
+        # 已发出与已完成的保存代数
+        self._issued = 0
+        self._completed = 0
+        self._issued_at = 0.0
+
+    @property
+    def pending(self) -> bool:
+        """是否有尚未完成的保存"""
+        with self._cond:
+            return self._is_pending()
+
+    def _is_pending(self) -> bool:
+        return (
+            self._completed < self._issued
+            and time.monotonic() - self._issued_at < self._timeout
+        )
+
+    def request_save(self, server: ServerInterface) -> int:
+        """
+        请求保存存档
+
+        已有保存进行中时直接并入该次保存，不再重复发送 save-all
+
+        Returns:
+            需要等待的保存代数
+        """
+        with self._cond:
+            if self._is_pending():
+                return self._issued
+            if not server.is_server_running():
+                # 服务端未运行，文件不会再变化
+                return self._completed
+            self._issued += 1
+            self._issued_at = time.monotonic()
+            generation = self._issued
+
+        server.execute("save-off")
+        server.execute("save-all")
+        server.execute("save-on")
+        return generation
+
+    def wait(self, generation: int, timeout: float | None = None) -> bool:
+        """
+        等待指定代数的保存完成
+
+        Args:
+            generation: request_save 返回的代数
+            timeout: 最长等待时间（秒），None 时使用默认超时
+
+        Returns:
+            是否在超时前完成
+        """
+        timeout = self._timeout if timeout is None else timeout
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._completed >= generation, timeout=timeout
+            )
+
+    def on_info(self, info: Info) -> None:
+        """处理服务端输出，检测保存完成"""
+        if info.is_user or info.content is None:
+            return
+        if _SAVE_COMPLETE_RE.match(info.content) is None:
+            return
+
+        with self._cond:
+            # 服务端按顺序执行命令，一次保存完成即满足此前发出的所有请求
+            self._completed = self._issued
+            self._cond.notify_all()
+
+        logger.debug("Server save completed, refreshing stats")
+        try:
+            self._on_saved()
+        except Exception:
+            logger.exception("Stats refresh after save failed")
@@ -12,7 +12,8 @@ from typing import TYPE_CHECKING
 from .config import PluginConfig
 from .constants import PLUGIN_ID, SCOREBOARD_NAME
 from .models import Preset
-from .stats_service import StatsService
+from .selectors import is_selector
+from .stats_service import StatsService, is_derived_category
 from .utils import generate_unique_abbreviations
 
 if TYPE_CHECKING:
@@ -20,6 +21,9 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(PLUGIN_ID)
 
+# 数据包中记录加和计分板已创建计分项的文件
+OBJECTIVES_FILE = "objectives.json"
+
 
 class ScoreboardService:
     """计分板服务"""
@@ -65,12 +69,12 @@ class ScoreboardService:
         display_json = json.dumps({"text": display_name})
         server.execute(
             f"scoreboard objectives add {inner_name} "
-            f"minecraft.{category}:minecraft.{item} {display_json}"
+            f"{self._criteria(category, item)} {display_json}"
         )
 
         for name, value in ranking.items():
             server.execute(
-                f"scoreboard players set {name} {inner_name} {value}"
+                f"scoreboard players set {name} {inner_name} {round(value)}"
             )
 
         self._enable_command_feedback(server)
@@ -80,6 +84,13 @@ class ScoreboardService:
 
         return ranking
 
+    @staticmethod
+    def _criteria(category: str, item: str) -> str:
+        """计分板准则，派生指标与选择器没有对应的单项游戏统计，使用 dummy 并由插件写入分数"""
+        if is_derived_category(category) or is_selector(category) or is_selector(item):
+            return "dummy"
+        return f"minecraft.{category}:minecraft.{item}"
+
     def set_display(
         self, server: ServerInterface, scoreboard_name: str = ""
     ) -> None:
@@ -104,25 +115,28 @@ class ScoreboardService:
         include_bots: bool = False,
     ) -> dict[str, int]:
         """创建加和计分板"""
+        preset = self._expand_preset(preset)
         self._init_preset_abbreviations(preset)
 
         commands = self._generate_scoreboard_commands(preset)
-        all_scores: dict[str, int] = {}
+        # 一次获取所有计分项的分数与总和
+        rankings = self.stats_service.get_rankings(
+            preset.get_all_items(), include_bots=include_bots
+        )
+        all_scores = rankings.totals
 
         self._disable_command_feedback(server)
 
         for category, items in preset.items.items():
             for item, abbr in items.items():
                 inner_name = f"{preset.prefix_true}_{abbr}"
-                scores = self._create_scoreboard_no_feedback(
+                self._create_scoreboard_no_feedback(
                     server,
                     category=category,
                     item=item,
                     inner_name=inner_name,
-                    include_bots=include_bots,
+                    scores=rankings.scores[(category, item)],
                 )
-                for player, score in scores.items():
-                    all_scores[player] = all_scores.get(player, 0) + score
 
         for cmd in commands["creating"]:
             server.execute(cmd)
@@ -130,12 +144,15 @@ class ScoreboardService:
         for player, total in all_scores.items():
             server.execute(
                 f"scoreboard players set {player} "
-                f"{preset.prefix_dummy}_total {total}"
+                f"{preset.prefix_dummy}_total {round(total)}"
             )
 
         self._enable_command_feedback(server)
 
         self._create_datapack(preset)
+        self._save_objectives(
+            preset, commands["true_names"] + commands["dummy_names"]
+        )
         server.execute("reload")
 
         return all_scores
@@ -146,42 +163,44 @@ class ScoreboardService:
         category: str,
         item: str,
         inner_name: str,
-        include_bots: bool = False,
-    ) -> dict[str, int]:
+        scores: dict[str, int],
+    ) -> None:
         """创建计分板（不控制 command feedback，用于批量操作内部调用）"""
         display_name = f"§e{category}§r.§b{item}§r"
 
-        ranking = self.stats_service.get_ranking(
-            category=category,
-            item=item,
-            include_bots=include_bots,
-        )
-
         server.execute(f"scoreboard objectives remove {inner_name}")
 
         display_json = json.dumps({"text": display_name})
         server.execute(
             f"scoreboard objectives add {inner_name} "
-            f"minecraft.{category}:minecraft.{item} {display_json}"
+            f"{self._criteria(category, item)} {display_json}"
         )
 
-        for name, value in ranking.items():
+        for name, value in scores.items():
             server.execute(
-                f"scoreboard players set {name} {inner_name} {value}"
+                f"scoreboard players set {name} {inner_name} {round(value)}"
             )
 
-        return ranking
-
     def remove_sum_scoreboard(
         self, server: ServerInterface, preset: Preset
     ) -> None:
-        """移除加和计分板"""
-        commands = self._generate_scoreboard_commands(preset)
+        """
+        移除加和计分板
+
+        按创建时记录的计分项移除，选择器在创建后匹配到的新统计项不会影响移除；
+        没有记录时（旧版本创建的数据包）重新展开预设
+        """
+        objectives = self._load_objectives(preset)
+        if objectives is None:
+            expanded = self._expand_preset(preset)
+            self._init_preset_abbreviations(expanded)
+            commands = self._generate_scoreboard_commands(expanded)
+            objectives = commands["true_names"] + commands["dummy_names"]
 
         self._disable_command_feedback(server)
 
-        for cmd in commands["removing"]:
-            server.execute(cmd)
+        for name in objectives:
+            server.execute(f"scoreboard objectives remove {name}")
 
         self._enable_command_feedback(server)
 
@@ -191,6 +210,51 @@ class ScoreboardService:
 
         server.execute("reload")
 
+    def _save_objectives(self, preset: Preset, objectives: list[str]) -> None:
+        """记录加和计分板创建的计分项"""
+        path = self._get_datapack_path(preset) / OBJECTIVES_FILE
+        path.write_text(json.dumps(objectives, indent=4), encoding="utf-8")
+
+    def _load_objectives(self, preset: Preset) -> list[str] | None:
+        """读取加和计分板创建时记录的计分项，没有记录或无法读取时返回 None"""
+        path = self._get_datapack_path(preset) / OBJECTIVES_FILE
+        if not path.exists():
+            return None
+        try:
+            objectives = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read {path}: {e}")
+            return None
+        if not isinstance(objectives, list):
+            return None
+        return [str(name) for name in objectives]
+
+    def _expand_preset(self, preset: Preset) -> Preset:
+        """
+        将预设中的选择器计分项展开为已知的具体计分项
+
+        不含选择器时直接返回原预设，否则返回展开后的副本，不修改配置中的预设
+        """
+        if not any(
+            is_selector(category) or is_selector(item)
+            for category, item in preset.get_all_items()
+        ):
+            return preset
+
+        expanded = Preset(
+            name=preset.name,
+            display_name=preset.display_name,
+            prefix_dummy=preset.prefix_dummy,
+            prefix_true=preset.prefix_true,
+        )
+        for category, item in preset.get_all_items():
+            if is_selector(category) or is_selector(item):
+                for name in self.stats_service.resolve_selector(category, item):
+                    expanded.add_item(*name)
+            else:
+                expanded.add_item(category, item)
+        return expanded
+
     def _init_preset_abbreviations(self, preset: Preset) -> None:
         """初始化预设的缩写"""
         all_items = []
@@ -202,7 +266,7 @@ class ScoreboardService:
             return
 
         abbrs = generate_unique_abbreviations(*all_items)
-        item_abbr_map = dict(zip(sorted(all_items), abbrs))
+        item_abbr_map = dict(zip(sorted(all_items), abbrs, strict=True))
 
         for category in preset.items:
             for item in preset.items[category]:
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""统计项选择器模块"""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Lock
+
+from .registry import KeyRegistry
+from .utils import strip_prefix
+
+# 正则选择器前缀
+REGEX_SELECTOR_PREFIX = "re:"
+# 通配符字符
+_GLOB_CHARS = frozenset("*?[")
+# 大于任意物品名的哨兵，用于前缀区间的右边界
+_MAX_CHAR = "\U0010ffff"
+
+
+def is_selector(text: str | None) -> bool:
+    """文本是否为通配符或正则选择器"""
+    if not text:
+        return False
+    return text.startswith(REGEX_SELECTOR_PREFIX) or not _GLOB_CHARS.isdisjoint(text)
+
+
+@dataclass(frozen=True)
+class StatSelector:
+    """
+    类别或物品选择器
+
+    支持精确名称、通配符（*_pickaxe）与正则（re:.*_ore）三种形式，
+    匹配时均使用去除 minecraft: 前缀的名称
+    """
+
+    text: str
+    # 精确名称时为 None
+    pattern: re.Pattern | None
+    # 通配符开头的字面前缀，用于在有序目录中截取区间
+    prefix: str
+
+    @property
+    def is_literal(self) -> bool:
+        return self.pattern is None
+
+    def matches(self, name: str) -> bool:
+        """名称是否匹配"""
+        name = strip_prefix(name)
+        if self.pattern is None:
+            return name == self.prefix
+        return self.pattern.fullmatch(name) is not None
+
+
+@lru_cache(maxsize=256)
+def compile_selector(text: str) -> StatSelector:
+    """
+    编译选择器
+
+    Raises:
+        re.error: 正则表达式无效
+    """
+    if text.startswith(REGEX_SELECTOR_PREFIX):
+        return StatSelector(text, re.compile(text[len(REGEX_SELECTOR_PREFIX) :]), "")
+
+    body = strip_prefix(text)
+    if _GLOB_CHARS.isdisjoint(body):
+        return StatSelector(text, None, body)
+    prefix_end = min(body.find(c) for c in _GLOB_CHARS if c in body)
+    return StatSelector(text, re.compile(fnmatch.translate(body)), body[:prefix_end])
+
+
+def _select(names: list, selector: StatSelector) -> list:
+    """
+    在按名称排序的列表中选出匹配项
+
+    Args:
+        names: 按首元素（名称）排序的元组列表
+        selector: 选择器
+    """
+    pattern = selector.pattern
+    if pattern is None:
+        lo = bisect_left(names, (selector.prefix,))
+        hi = bisect_left(names, (selector.prefix + "\0",))
+        return names[lo:hi]
+    if selector.prefix:
+        lo = bisect_left(names, (selector.prefix,))
+        hi = bisect_left(names, (selector.prefix + _MAX_CHAR,))
+        names = names[lo:hi]
+    return [entry for entry in names if pattern.fullmatch(entry[0]) is not None]
+
+
+class StatCatalog:
+    """
+    (类别, 物品) 键目录
+
+    按类别保存有序的 (物品, 键 id) 列表，随键字典增长增量更新；
+    选择器的解析结果按键字典大小缓存
+    """
+
+    def __init__(self, registry: KeyRegistry):
+        self._registry = registry
+        self._lock = Lock()
+        # 已收录的键数量
+        self._size = 0
+        # [(类别,)]，与物品列表同样使用元组以便二分
+        self._categories: list[tuple[str]] = []
+        self._items: dict[str, list[tuple[str, int]]] = {}
+        self._resolved: dict[tuple[str, str], tuple[int, ...]] = {}
+
+    def refresh(self) -> None:
+        """收录键字典中新增的键"""
+        registry = self._registry
+        if len(registry) == self._size:
+            return
+        with self._lock:
+            size = len(registry)
+            for key_id in range(self._size, size):
+                category, item = registry.short_key(key_id)
+                items = self._items.get(category)
+                if items is None:
+                    items = self._items[category] = []
+                    insort(self._categories, (category,))
+                insort(items, (item, key_id))
+            self._size = size
+            self._resolved.clear()
+
+    def resolve(self, category: str, item: str) -> tuple[int, ...]:
+        """
+        解析选择器为匹配的键 id
+
+        Args:
+            category: 类别或类别选择器
+            item: 物品或物品选择器
+
+        Raises:
+            re.error: 正则表达式无效
+        """
+        self.refresh()
+        cache_key = (category, item)
+        key_ids = self._resolved.get(cache_key)
+        if key_ids is not None:
+            return key_ids
+
+        category_selector = compile_selector(category)
+        item_selector = compile_selector(item)
+        with self._lock:
+            key_ids = tuple(
+                key_id
+                for (name,) in _select(self._categories, category_selector)
+                for _, key_id in _select(self._items[name], item_selector)
+            )
+            self._resolved[cache_key] = key_ids
+        return key_ids
+
+    def resolve_names(self, category: str, item: str) -> list[tuple[str, str]]:
+        """解析选择器为匹配的 (类别, 物品)，均不带 minecraft: 前缀"""
+        short_key = self._registry.short_key
+        return [short_key(key_id) for key_id in self.resolve(category, item)]
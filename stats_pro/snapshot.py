@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""统计数据快照模块"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field, replace
+from typing import Callable
+
+from .models import FileState
+from .ranking_index import RankingIndex
+from .store import ColumnarStore
+
+
+@dataclass(frozen=True)
+class StatsSnapshot:
+    """
+    不可变的统计数据快照
+
+    由 StatsService 在后台构建后原子替换，发布后不再修改。
+    读取方只需持有一次引用即可获得一致的视图，无需加锁
+    """
+
+    # 单调递增的版本号，可作为缓存键的一部分
+    version: int
+    store: ColumnarStore
+    # {uuid: FileState}，与 store 中的数据对应
+    file_states: dict[str, FileState]
+    # {玩家名: uuid}
+    uuid_mapping: dict[str, str]
+    names_by_uuid: dict[str, tuple[str, ...]]
+    player_ids_by_uuid: dict[str, tuple[int, ...]]
+    # 机器人位图，按玩家名 id 索引，非 0 表示机器人
+    bot_mask: bytes
+    # 构建位图使用的机器人判断，映射变化时沿用
+    classify_bot: Callable[[str], bool] = field(compare=False, repr=False)
+    # (类别, 物品) 排行索引，按需构建并随快照增量更新
+    ranking_index: RankingIndex = field(default_factory=RankingIndex)
+
+    def is_bot_id(self, player_id: int) -> bool:
+        """玩家名 id 是否为机器人"""
+        return player_id < len(self.bot_mask) and self.bot_mask[player_id] != 0
+
+    def is_bot_name(self, name: str) -> bool:
+        """玩家名是否为机器人"""
+        player_id = self.store.registry.player_id(name)
+        return player_id is not None and self.is_bot_id(player_id)
+
+    @classmethod
+    def build(
+        cls,
+        version: int,
+        store: ColumnarStore,
+        file_states: dict[str, FileState],
+        uuid_mapping: dict[str, str],
+        is_bot: Callable[[str], bool],
+    ) -> StatsSnapshot:
+        """
+        构建快照，玩家名会被驻留到存储使用的键字典中
+
+        Args:
+            is_bot: 机器人判断，每个玩家名只调用一次，结果写入位图
+        """
+        registry = store.registry
+        names_by_uuid: dict[str, list[str]] = {}
+        player_ids_by_uuid: dict[str, list[int]] = {}
+        bot_player_ids: list[int] = []
+        for name, uuid in uuid_mapping.items():
+            player_id = registry.intern_player(name)
+            names_by_uuid.setdefault(uuid, []).append(registry.player_name(player_id))
+            player_ids_by_uuid.setdefault(uuid, []).append(player_id)
+            if is_bot(name):
+                bot_player_ids.append(player_id)
+
+        bot_mask = bytearray(max(bot_player_ids) + 1 if bot_player_ids else 0)
+        for player_id in bot_player_ids:
+            bot_mask[player_id] = 1
+
+        return cls(
+            version=version,
+            store=store,
+            file_states=file_states,
+            uuid_mapping=uuid_mapping,
+            names_by_uuid={uuid: tuple(names) for uuid, names in names_by_uuid.items()},
+            player_ids_by_uuid={uuid: tuple(ids) for uuid, ids in player_ids_by_uuid.items()},
+            bot_mask=bytes(bot_mask),
+            classify_bot=is_bot,
+        )
+
+    def evolve(
+        self,
+        store: ColumnarStore | None = None,
+        file_states: dict[str, FileState] | None = None,
+        uuid_mapping: dict[str, str] | None = None,
+        changed_uuids: Iterable[str] | None = None,
+        is_bot: Callable[[str], bool] | None = None,
+    ) -> StatsSnapshot:
+        """
+        基于当前快照构建下一个版本，未指定的部分沿用当前快照
+
+        Args:
+            store: 新存储
+            file_states: 新的文件状态
+            uuid_mapping: 新的 UUID 映射
+            changed_uuids: store 相对当前存储发生变化的玩家，
+                为 None 时视为整体替换，排行索引将重新构建
+            is_bot: 机器人判断，指定时重新分类所有玩家
+        """
+        if uuid_mapping is None and is_bot is None:
+            if store is None:
+                ranking_index = self.ranking_index
+            elif changed_uuids is None:
+                ranking_index = RankingIndex()
+            else:
+                ranking_index = self.ranking_index.evolve(
+                    self.store, store, changed_uuids, self.names_by_uuid, self.is_bot_name
+                )
+            return StatsSnapshot(
+                version=self.version + 1,
+                store=store if store is not None else self.store,
+                file_states=file_states if file_states is not None else self.file_states,
+                uuid_mapping=self.uuid_mapping,
+                names_by_uuid=self.names_by_uuid,
+                player_ids_by_uuid=self.player_ids_by_uuid,
+                bot_mask=self.bot_mask,
+                classify_bot=self.classify_bot,
+                ranking_index=ranking_index,
+            )
+        return StatsSnapshot.build(
+            self.version + 1,
+            store if store is not None else self.store,
+            file_states if file_states is not None else self.file_states,
+            uuid_mapping if uuid_mapping is not None else self.uuid_mapping,
+            is_bot if is_bot is not None else self.classify_bot,
+        )
+
+    def with_ranking_index(self, ranking_index: RankingIndex) -> StatsSnapshot:
+        """替换排行索引，版本不变，用于接管重载前基于相同数据构建的索引"""
+        return replace(self, ranking_index=ranking_index)
@@ -5,155 +5,955 @@ from __future__ import annotations
 
 import json
 import logging
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from operator import itemgetter
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from threading import Lock, RLock
+from typing import TYPE_CHECKING, Any, Callable, cast
 
-from .cache import StatsCache, get_stats_cache
+from .bots import BotClassifier
+from .cache import (
+    ANY_TAG,
+    CATALOG_TAG,
+    ComputeResult,
+    StatsCache,
+    category_tag,
+    get_stats_cache,
+    item_tag,
+    key_tag,
+    player_tag,
+)
 from .config import PluginConfig
-from .constants import PLUGIN_ID
-from .models import PlayerStats
+from .constants import (
+    DERIVED_CATEGORY,
+    HANDOFF_FORMAT_VERSION,
+    PLUGIN_ID,
+    SNAPSHOT_FORMAT_VERSION,
+)
+from .derived import DerivedMetric, load_derived_metrics, normalize_value
+from .distribution import compute_distribution
+from .groups import GroupIndex
+from .loader import (
+    dump_parsed_stats,
+    load_parsed_stats,
+    parse_stats_file,
+    parse_stats_files,
+)
+from .models import (
+    FileState,
+    MetricRankings,
+    PlayerStats,
+    RankPosition,
+    StatDistribution,
+)
+from .ranking_index import RankingIndex
+from .refresher import StatsRefresher
+from .registry import KeyRegistry, get_key_registry
+from .selectors import StatCatalog, compile_selector, is_selector
+from .snapshot import StatsSnapshot
+from .store import ColumnarStore
 from .utils import (
     build_uuid_mapping_from_stats,
     ensure_prefix,
-    is_bot_player,
+    get_file_state,
     load_uuid_mapping,
     save_uuid_mapping,
+    scan_stats_files,
     strip_prefix,
 )
+from .watcher import StatsWatcher
 
 if TYPE_CHECKING:
     pass
 
 logger = logging.getLogger(PLUGIN_ID)
 
+# id 形式的排行榜行 (数值, 玩家名 id, 键 id)
+RankingRow = tuple[int, int, int]
+
+
+def is_derived_category(category: str | None) -> bool:
+    """类别是否表示派生指标"""
+    return category is not None and strip_prefix(category) == DERIVED_CATEGORY
+
 
 class StatsService:
     """玩家统计数据服务"""
 
-    def __init__(self, config: PluginConfig, cache_ttl: float = 30.0):
+    def __init__(
+        self,
+        config: PluginConfig,
+        cache_ttl: float = 30.0,
+        handoff: dict[str, Any] | None = None,
+    ):
+        """
+        Args:
+            config: 插件配置
+            cache_ttl: 结果缓存的过期时间（秒）
+            handoff: 重载前的实例导出的状态，之后需调用 import_state 接管
+        """
         self.config = config
-        self._uuid_mapping: dict[str, str] = {}
-        self._players_stats: dict[str, PlayerStats] = {}
-        self._cache: StatsCache = get_stats_cache(ttl=cache_ttl)
+        self._registry: KeyRegistry = get_key_registry()
+        # 已知 (类别, 物品) 键目录，用于解析通配符与正则选择器
+        self._catalog = StatCatalog(self._registry)
+        self._bots = BotClassifier(config.bot_rules, config.paths.mcdr_root)
+        self._derived: dict[str, DerivedMetric] = load_derived_metrics(config.derived_metrics)
+        # 上次计算变化标签时键字典的大小
+        self._tagged_keys = 0
+        # 玩家→分组索引，快照或分组变化后在下次分组查询时重建
+        self._group_index: GroupIndex | None = None
+        # 当前发布的快照，只会被整体替换
+        self._snapshot = StatsSnapshot.build(
+            0, ColumnarStore(registry=self._registry), {}, {}, self._bots.is_bot
+        )
+        self._loaded = False
+        # 惰性加载模式下的单玩家 LRU 缓存 {name: (FileState, PlayerStats)}
+        self._lazy_players: OrderedDict[str, tuple[FileState, PlayerStats]] = OrderedDict()
+        # 构建 UUID 映射时 usercache.json 的状态，先于映射读取
+        self._usercache_state: FileState | None = get_file_state(config.paths.usercache_file)
+        self._last_reload_count = 0
+        # 与磁盘快照内容一致的快照版本，未变化时关闭插件无需重写快照
+        self._saved_version: int | None = None
+        self._cache: StatsCache = get_stats_cache(
+            ttl=cache_ttl, max_bytes=config.performance.cache_max_bytes
+        )
+        # 全局缓存可能残留同一模块中上一个服务实例的条目，其快照版本与本实例无关
+        self._cache.reset()
+        # 写入锁，仅用于串行化快照的构建与发布，读取无需加锁
+        self._lock = RLock()
+        # 快照写入锁，后台保存与关闭时的保存共用同一临时文件
+        self._save_lock = Lock()
+        self._watcher: StatsWatcher | None = None
+        self._refresher: StatsRefresher | None = None
+        if handoff is not None:
+            # 构建 UUID 映射会按文件顺序分配玩家名 id，需先按移交方的顺序驻留，
+            # 否则会话中加入的玩家使 id 与移交方不一致，排行索引与缓存无法复用
+            self._import_registry(handoff)
         self._reload_uuid_mapping()
 
-    def _reload_uuid_mapping(self) -> None:
+    def _import_registry(self, state: dict[str, Any]) -> bool:
+        """
+        按移交方的顺序驻留键与玩家名
+
+        Returns:
+            id 是否与移交方一致，移交内容无效时为 False
         """
-        重新加载 UUID 映射
+        if state.get("format") != (HANDOFF_FORMAT_VERSION, SNAPSHOT_FORMAT_VERSION):
+            return False
+        try:
+            return self._registry.import_state(state["registry"])
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    @property
+    def snapshot(self) -> StatsSnapshot:
+        """当前发布的统计数据快照"""
+        return self._snapshot
+
+    def _publish(
+        self,
+        store: ColumnarStore | None = None,
+        file_states: dict[str, FileState] | None = None,
+        uuid_mapping: dict[str, str] | None = None,
+        changed_uuids: Iterable[str] | None = None,
+        is_bot: Callable[[str], bool] | None = None,
+    ) -> StatsSnapshot:
+        """基于当前快照构建新版本并原子替换，调用方需持有写入锁"""
+        snapshot = self._snapshot.evolve(store, file_states, uuid_mapping, changed_uuids, is_bot)
+        self._snapshot = snapshot
+        return snapshot
+
+    def _load_uuid_mapping(self, uuids: Iterable[str] | None = None) -> dict[str, str] | None:
+        """
+        重新构建 UUID 映射
         优先级：
         1. 从 stats 文件夹 + usercache.json 自动构建
         2. 合并手动配置的 uuid.json（用于覆盖或补充）
+
+        Args:
+            uuids: 已扫描得到的 UUID 列表，避免重复遍历 stats 文件夹
+
+        Returns:
+            新的映射，未发生变化时返回 None
         """
         # 自动从 stats 文件夹和 usercache.json 构建映射
         auto_mapping = build_uuid_mapping_from_stats(
             self.config.paths.stats_path,
             self.config.paths.usercache_file,
+            uuids,
         )
         
         # 加载手动配置的映射（可以用于覆盖自动检测的名称）
         manual_mapping = load_uuid_mapping(self.config.paths.uuid_file)
         
         # 合并：手动配置优先
-        self._uuid_mapping = {**auto_mapping, **manual_mapping}
+        mapping = {**auto_mapping, **manual_mapping}
+        if mapping == self._snapshot.uuid_mapping:
+            return None
         
         # 保存合并后的映射，方便用户查看和编辑
-        if self._uuid_mapping:
-            save_uuid_mapping(self.config.paths.uuid_file, self._uuid_mapping)
+        if mapping:
+            save_uuid_mapping(self.config.paths.uuid_file, mapping)
+        return mapping
+
+    def _reload_uuid_mapping(self, uuids: Iterable[str] | None = None) -> bool:
+        """
+        重新加载 UUID 映射并发布新快照
+
+        Returns:
+            映射是否发生变化
+        """
+        with self._lock:
+            mapping = self._load_uuid_mapping(uuids)
+            if mapping is None:
+                return False
+            self._publish(uuid_mapping=mapping)
+            return True
 
     @property
     def uuid_mapping(self) -> dict[str, str]:
         """获取 UUID 映射"""
-        return self._uuid_mapping
+        return self._snapshot.uuid_mapping
 
     def get_uuid(self, name: str) -> str | None:
         """根据玩家名获取 UUID"""
-        return self._uuid_mapping.get(name)
+        return self._snapshot.uuid_mapping.get(name)
 
     def get_name(self, uuid: str) -> str | None:
         """根据 UUID 获取玩家名"""
-        for name, uid in self._uuid_mapping.items():
-            if uid == uuid:
-                return name
-        return None
+        names = self._snapshot.names_by_uuid.get(uuid)
+        return names[0] if names else None
 
     def convert_to_name(self, identifier: str) -> str:
         """将标识符（名称或UUID）转换为名称"""
-        if identifier in self._uuid_mapping:
+        snapshot = self._snapshot
+        if identifier in snapshot.uuid_mapping:
             return identifier
-        name = self.get_name(identifier)
-        return name if name else identifier
+        names = snapshot.names_by_uuid.get(identifier)
+        return names[0] if names else identifier
 
     def reload_all_stats(self) -> dict[str, PlayerStats]:
         """重新加载所有玩家的统计数据"""
-        self._reload_uuid_mapping()
-        self._players_stats.clear()
-        self._cache.invalidate_all()
+        self.refresh_stats(full=True)
+        return self.get_all_stats()
+
+    def refresh_stats(self, full: bool = False) -> int:
+        """
+        增量重载统计数据
+
+        通过 (mtime_ns, size, inode) 判断文件是否变化，
+        仅重新解析新增或变化的文件，并移除已删除文件对应的玩家。
+        新数据在副本上构建，完成后作为新快照发布
 
+        Args:
+            full: 是否忽略已有数据，重新解析全部文件
+
+        Returns:
+            实际重新读取的文件数
+        """
         stats_path = self.config.paths.stats_path
-        if not stats_path.exists():
-            logger.warning(f"Stats path does not exist: {stats_path}")
-            return self._players_stats
+        with self._lock:
+            if full:
+                self._usercache_state = None
 
-        for name, uuid in self._uuid_mapping.items():
-            file_path = stats_path / f"{uuid}.json"
-            if file_path.exists():
-                try:
-                    self._players_stats[name] = PlayerStats.from_file(
-                        file_path, name, uuid
+            if self._bots.refresh_tags():
+                # 机器人名单变化，重新分类所有玩家
+                snapshot = self._publish(is_bot=self._bots.is_bot)
+                self._cache.invalidate_all(snapshot.version)
+
+            if not stats_path.exists():
+                logger.warning(f"Stats path does not exist: {stats_path}")
+                if len(self._snapshot.store) or self._snapshot.file_states:
+                    snapshot = self._publish(
+                        store=ColumnarStore(registry=self._registry), file_states={}
                     )
-                    self._cache.set_player_stats(name, self._players_stats[name].stats)
+                    self._cache.invalidate_all(snapshot.version)
+                self._last_reload_count = 0
+                self._loaded = True
+                return 0
+
+            count = self._apply_file_states(scan_stats_files(stats_path), full=full)
+            self._loaded = True
+            self._lazy_players.clear()
+            return count
+
+    def apply_stats_file_change(self, uuid: str) -> int:
+        """处理单个 stats 文件的变化，见 apply_stats_file_changes"""
+        return self.apply_stats_file_changes((uuid,))
+
+    def apply_stats_file_changes(self, uuids: Iterable[str]) -> int:
+        """
+        处理一批 stats 文件的变化（由文件监视器推送）
+
+        仅重新解析这些文件，整批只发布一次快照，并只使相关玩家的缓存失效
+
+        Returns:
+            实际重新读取的文件数
+        """
+        stats_path = self.config.paths.stats_path
+        file_states = {uuid: get_file_state(stats_path / f"{uuid}.json") for uuid in uuids}
+        with self._lock:
+            if not self._loaded:
+                # 尚未加载全部数据（惰性模式），仅使这些玩家的惰性缓存失效
+                for uuid in file_states:
+                    for name in self._snapshot.names_by_uuid.get(uuid, ()):
+                        self._lazy_players.pop(name, None)
+                return 0
+            states = dict(self._snapshot.file_states)
+            for uuid, state in file_states.items():
+                if state is None:
+                    states.pop(uuid, None)
+                else:
+                    states[uuid] = state
+            return self._apply_file_states(states, candidates=file_states.keys())
+
+    def apply_usercache_change(self) -> None:
+        """处理 usercache.json 的变化（由文件监视器推送）"""
+        with self._lock:
+            if not self._loaded:
+                if self._reload_uuid_mapping():
+                    self._lazy_players.clear()
+                return
+            self._apply_file_states(self._snapshot.file_states, candidates=())
+
+    def resync(self) -> None:
+        """全量同步（文件监视器丢失事件时调用）"""
+        with self._lock:
+            if not self._loaded:
+                self._reload_uuid_mapping()
+                self._lazy_players.clear()
+                return
+        self.refresh_stats()
+
+    def _apply_file_states(
+        self,
+        states: dict[str, FileState],
+        candidates: Iterable[str] | None = None,
+        full: bool = False,
+    ) -> int:
+        """
+        根据新的文件状态构建并发布新快照
 
-                    # 检测并更新 DataVersion
-                    if self._players_stats[name].data_version is not None:
-                        self.config.update_data_version(self._players_stats[name].data_version)
-                except (json.JSONDecodeError, OSError) as e:
-                    logger.warning(f"Failed to load stats for {name}: {e}")
+        Args:
+            states: 最新的 {uuid: FileState}，发布后不可再修改
+            candidates: 可能变化的 UUID，为 None 时与全部旧状态比较
+            full: 是否从空存储开始重建
+
+        Returns:
+            实际重新读取的文件数
+        """
+        stats_path = self.config.paths.stats_path
+        snapshot = self._snapshot
+        previous = {} if full else snapshot.file_states
+        if candidates is None:
+            candidates = {*states, *previous}
+        changed = {
+            uuid for uuid in candidates
+            if uuid in states and previous.get(uuid) != states[uuid]
+        }
+        removed = [
+            uuid for uuid in candidates
+            if uuid not in states and uuid in previous
+        ]
+
+        # 文件增删或 usercache 变化时才需要重建 UUID 映射
+        mapping = None
+        usercache_state = get_file_state(self.config.paths.usercache_file)
+        added = any(uuid not in previous for uuid in changed)
+        if added or removed or usercache_state != self._usercache_state:
+            mapping = self._load_uuid_mapping(states.keys())
+            self._usercache_state = usercache_state
+
+        self._last_reload_count = len(changed)
+        if not full and not changed and not removed and mapping is None:
+            return 0
+
+        # 按 UUID 排序后解析，保证合并结果与并行度无关
+        changed_uuids = sorted(changed)
+        performance = self.config.performance
+        results = parse_stats_files(
+            [str(stats_path / f"{uuid}.json") for uuid in changed_uuids],
+            workers=performance.effective_parse_workers,
+            executor=performance.parse_executor,
+        )
+
+        loaded: list[tuple[str, int | None, dict[str, dict[str, int]]]] = []
+        failed: list[tuple[str, str]] = []
+        for uuid, (data_version, stats, error) in zip(changed_uuids, results, strict=True):
+            if error is not None or stats is None:
+                failed.append((uuid, error or "no stats"))
+                continue
+            loaded.append((uuid, data_version, stats))
+
+            # 检测并更新 DataVersion
+            if data_version is not None:
+                self.config.update_data_version(data_version)
+
+        if full:
+            # 全量加载按列整体构建
+            store = ColumnarStore.build(loaded, registry=self._registry)
+        else:
+            # 在副本上修改，读取方在发布前始终看到旧快照
+            store = snapshot.store.fork()
+            for uuid, data_version, stats in loaded:
+                store.put(uuid, data_version, stats)
+            for uuid in (*removed, *(uuid for uuid, _ in failed)):
+                store.remove(uuid)
+
+        tags = None if full or mapping is not None else self._change_tags(
+            snapshot.store, store, (*changed, *removed)
+        )
+        snapshot = self._publish(
+            store=store,
+            file_states=states,
+            uuid_mapping=mapping,
+            changed_uuids=None if full else (*changed, *removed),
+        )
+        # 收录新出现的 (类别, 物品) 键，查询时选择器无需再扫描键字典
+        self._catalog.refresh()
+
+        for uuid, error in failed:
+            name = snapshot.names_by_uuid.get(uuid, (uuid,))[0]
+            logger.warning(f"Failed to load stats for {name}: {error}")
+
+        # 行以 UUID 为键，名称变化无需改动存储，只需使缓存失效；
+        # 其余情况只使依赖变化的键与玩家的条目失效
+        if tags is None:
+            self._cache.invalidate_all(snapshot.version)
+            self._tagged_keys = len(self._registry)
+        else:
+            self._cache.invalidate_tags(tags, snapshot.version)
 
         # 根据检测到的版本更新默认预设工具
         self.config.update_default_preset_tools()
 
-        return self._players_stats
+        logger.debug(
+            f"Stats refreshed: {len(changed)} file(s) re-read, {len(removed)} removed, "
+            f"snapshot version {snapshot.version}"
+        )
+        return len(changed)
+
+    def load_snapshot(self) -> int:
+        """
+        从磁盘快照恢复已解析的统计数据
+
+        恢复后需调用 refresh_stats，仅重新解析快照之后发生变化的文件
+
+        Returns:
+            恢复的文件条目数
+        """
+        payload = load_parsed_stats(self.config.paths.snapshot_file)
+        if payload is None:
+            return 0
+
+        file_states, store_state = payload
+        try:
+            store = ColumnarStore.from_state(store_state, registry=self._registry)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Stats snapshot is corrupted: {e}")
+            return 0
+
+        with self._lock:
+            snapshot = self._publish(store=store, file_states=file_states)
+            self._cache.invalidate_all(snapshot.version)
+            self._saved_version = snapshot.version
+
+        data_version = store.data_version()
+        if data_version is not None:
+            self.config.update_data_version(data_version)
+        logger.info(f"Loaded stats snapshot with {len(file_states)} file(s)")
+        return len(file_states)
+
+    def save_snapshot(self) -> int:
+        """
+        将当前已解析的统计数据写入磁盘快照
+
+        Returns:
+            写入的文件条目数
+        """
+        if not self._loaded:
+            # 未加载全部数据时不覆盖已有快照
+            return 0
+        with self._save_lock:
+            snapshot = self._snapshot
+            if snapshot.version == self._saved_version:
+                logger.debug("Stats snapshot is up to date, skipped saving")
+                return 0
+            try:
+                dump_parsed_stats(
+                    self.config.paths.snapshot_file,
+                    snapshot.file_states,
+                    snapshot.store.export_state(),
+                )
+            except OSError as e:
+                logger.error(f"Failed to save stats snapshot: {e}")
+                return 0
+            self._saved_version = snapshot.version
+        logger.debug(f"Saved stats snapshot with {len(snapshot.file_states)} file(s)")
+        return len(snapshot.file_states)
+
+    def export_state(self) -> dict[str, Any] | None:
+        """
+        导出已解析的数据、排行索引与缓存，供插件重载后的新实例通过 import_state 接管
+
+        导出内容只包含内置类型，不引用本模块定义的类；需在停止文件监视器与后台刷新后调用
+
+        Returns:
+            移交状态，未加载全部数据时返回 None
+        """
+        with self._lock:
+            if not self._loaded:
+                return None
+            snapshot = self._snapshot
+            return {
+                "format": (HANDOFF_FORMAT_VERSION, SNAPSHOT_FORMAT_VERSION),
+                "registry": self._registry.export_state(),
+                "store": snapshot.store.export_state(),
+                "file_states": {
+                    uuid: (state.mtime_ns, state.size, state.inode)
+                    for uuid, state in snapshot.file_states.items()
+                },
+                "saved": snapshot.version == self._saved_version,
+                # 以下内容决定排行索引与缓存能否复用
+                "uuid_mapping": dict(snapshot.uuid_mapping),
+                "bots": self._bot_names(snapshot),
+                "derived_metrics": dict(self.config.derived_metrics),
+                "rankings": snapshot.ranking_index.export_state(),
+                "caches": self._cache.export_state(),
+            }
+
+    def import_state(self, state: dict[str, Any]) -> bool:
+        """
+        接管插件重载前的实例导出的状态
+
+        UUID 映射、机器人分类与派生指标定义均未变化时一并接管排行索引与缓存，
+        否则只接管已解析的数据；接管后需调用 refresh_stats，
+        根据文件状态仅重新解析移交之后发生变化的文件，并只使依赖变化部分的缓存失效
+
+        Returns:
+            是否成功接管
+        """
+        if state.get("format") != (HANDOFF_FORMAT_VERSION, SNAPSHOT_FORMAT_VERSION):
+            logger.info("Discarded stats handoff: format version changed")
+            return False
+        # 按原顺序驻留键与玩家名，id 一致时 id 形式的索引与缓存可直接复用；
+        # 创建实例时传入同一状态则已驻留，此处不会改变 id
+        same_ids = self._import_registry(state)
+        try:
+            store = ColumnarStore.from_state(state["store"], registry=self._registry)
+            file_states = {
+                uuid: FileState(*file_state) for uuid, file_state in state["file_states"].items()
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Discarded stats handoff: {e}")
+            return False
+
+        with self._lock:
+            snapshot = self._publish(store=store, file_states=file_states)
+            self._catalog.refresh()
+            # 实例创建时已按当前文件构建 UUID 映射
+            self._usercache_state = get_file_state(self.config.paths.usercache_file)
+            self._tagged_keys = len(self._registry)
+            if state.get("saved"):
+                self._saved_version = snapshot.version
+
+            reused = 0
+            if not same_ids:
+                rebuild_reason = "key or player ids differ"
+            elif snapshot.uuid_mapping != state.get("uuid_mapping"):
+                rebuild_reason = "UUID mapping changed"
+            elif self._bot_names(snapshot) != state.get("bots"):
+                rebuild_reason = "bot classification changed"
+            elif self.config.derived_metrics != state.get("derived_metrics"):
+                rebuild_reason = "derived metrics changed"
+            else:
+                rebuild_reason = None
+                self._snapshot = snapshot.with_ranking_index(
+                    RankingIndex(dict(state.get("rankings", {})))
+                )
+                reused = self._cache.import_state(state.get("caches", {}))
+        if rebuild_reason is not None:
+            logger.info(f"Rebuilding ranking index and caches after handoff: {rebuild_reason}")
+
+        data_version = store.data_version()
+        if data_version is not None:
+            self.config.update_data_version(data_version)
+        logger.info(
+            f"Took over stats of {len(file_states)} file(s) from the previous instance, "
+            f"{reused} cache entries reused"
+        )
+        return True
+
+    @staticmethod
+    def _bot_names(snapshot: StatsSnapshot) -> list[str]:
+        """快照中被判定为机器人的玩家名，已排序"""
+        return sorted(name for name in snapshot.uuid_mapping if snapshot.is_bot_name(name))
+
+    def ensure_fresh(self, require_all: bool = False) -> None:
+        """
+        确保内存中的数据为最新
+
+        文件监视器运行时变化由监视器推送，无需访问磁盘；后台刷新运行时仅提交刷新请求，
+        调用方直接使用当前快照；否则同步执行增量重载。
+        惰性加载模式下，仅在 require_all 时才加载全部玩家数据
+
+        Args:
+            require_all: 调用方是否需要全部玩家的数据（如排行榜）
+        """
+        if not self._loaded:
+            if self.config.performance.lazy_load and not require_all:
+                self._refresh_lazy_mapping()
+                return
+            self.refresh_stats()
+        elif self.is_watching:
+            return
+        elif self._refresher is not None and self._refresher.is_running:
+            self._refresher.request()
+        else:
+            self.refresh_stats()
+
+    def refresh_now(self, timeout_ms: int | None = None) -> bool:
+        """
+        立即刷新并等待完成，用于需要最新数据的命令
+
+        Args:
+            timeout_ms: 最长等待时间（毫秒），None 时使用配置的 refresh_wait_ms
+
+        Returns:
+            是否在超时前完成，超时后调用方将使用当前快照
+        """
+        if not self._loaded or self._refresher is None:
+            self.refresh_stats()
+            return True
+        if timeout_ms is None:
+            timeout_ms = self.config.performance.refresh_wait_ms
+        done = self._refresher.refresh_now(timeout_ms)
+        if not done:
+            logger.debug(f"Stats refresh did not finish within {timeout_ms} ms")
+        return done
+
+    def request_refresh(self) -> None:
+        """请求一次增量刷新（如存档保存完成后），后台刷新未运行时同步执行"""
+        if not self._loaded:
+            return
+        if self._refresher is not None and self._refresher.is_running:
+            self._refresher.request(urgent=True)
+        else:
+            self.refresh_stats()
+
+    def _background_refresh(self) -> None:
+        """后台刷新回调，惰性加载尚未加载全部数据时只检查 UUID 映射，并顺带清理过期缓存"""
+        if self._loaded:
+            self.refresh_stats()
+        else:
+            self._refresh_lazy_mapping()
+        self._cache.sweep()
+
+    def _refresh_lazy_mapping(self) -> None:
+        """惰性加载模式下 usercache.json 变化时重建 UUID 映射，使新加入的玩家可被查询"""
+        state = get_file_state(self.config.paths.usercache_file)
+        if state == self._usercache_state:
+            return
+        with self._lock:
+            if self._loaded or state == self._usercache_state:
+                return
+            self._usercache_state = state
+            if self._reload_uuid_mapping():
+                self._lazy_players.clear()
+
+    def start_refresher(self) -> bool:
+        """根据配置启动后台刷新"""
+        performance = self.config.performance
+        if not performance.background_refresh:
+            return False
+        if self._refresher is None:
+            self._refresher = StatsRefresher(
+                self._background_refresh,
+                interval=performance.refresh_interval,
+                debounce=performance.refresh_debounce_ms / 1000,
+            )
+        return self._refresher.start()
+
+    def stop_refresher(self) -> None:
+        """停止后台刷新"""
+        if self._refresher is not None:
+            self._refresher.stop()
+            self._refresher = None
+
+    def start_watcher(self) -> bool:
+        """根据配置启动文件监视器"""
+        performance = self.config.performance
+        if performance.watcher == "off":
+            return False
+        if self._watcher is None:
+            self._watcher = StatsWatcher(
+                self.config.paths.stats_path,
+                self.config.paths.usercache_file,
+                on_stats_files=self.apply_stats_file_changes,
+                on_usercache=self.apply_usercache_change,
+                on_resync=self.resync,
+                mode=performance.watcher,
+                poll_interval=performance.watcher_poll_interval,
+            )
+        return self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        """停止文件监视器"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    @property
+    def is_watching(self) -> bool:
+        """文件监视器是否正在运行"""
+        return self._watcher is not None and self._watcher.is_running
+
+    @property
+    def last_reload_count(self) -> int:
+        """上一次重载实际重新读取的文件数"""
+        return self._last_reload_count
 
     def get_player_stats(self, name: str, reload: bool = False) -> PlayerStats | None:
         """获取单个玩家的统计数据"""
-        if reload or not self._players_stats:
-            self.reload_all_stats()
+        if not self._loaded and self.config.performance.lazy_load:
+            self._refresh_lazy_mapping()
+            return self._get_player_stats_lazy(self.convert_to_name(name))
+
+        if reload or not self._loaded:
+            self.refresh_stats()
 
         name = self.convert_to_name(name)
-        return self._players_stats.get(name)
+        snapshot = self._snapshot
+        uuid = snapshot.uuid_mapping.get(name)
+        if uuid is None:
+            return None
+        entry = snapshot.store.get(uuid)
+        if entry is None:
+            return None
+        data_version, stats = entry
+        return PlayerStats(name=name, uuid=uuid, data_version=data_version, stats=stats)
+
+    def _get_player_stats_lazy(self, name: str) -> PlayerStats | None:
+        """惰性加载单个玩家的统计数据，只读取该玩家的文件"""
+        uuid = self.get_uuid(name)
+        if uuid is None:
+            return None
+
+        file_path = self.config.paths.stats_path / f"{uuid}.json"
+        state = get_file_state(file_path)
+        with self._lock:
+            cached = self._lazy_players.get(name)
+            if state is None:
+                self._lazy_players.pop(name, None)
+                return None
+            if cached is not None and cached[0] == state:
+                self._lazy_players.move_to_end(name)
+                return cached[1]
+
+        data_version, stats, error = parse_stats_file(str(file_path))
+        if error is not None or stats is None:
+            logger.warning(f"Failed to load stats for {name}: {error or 'no stats'}")
+            return None
+
+        player_stats = PlayerStats(
+            name=name, uuid=uuid, data_version=data_version, stats=stats
+        )
+        with self._lock:
+            self._lazy_players[name] = (state, player_stats)
+            self._lazy_players.move_to_end(name)
+            while len(self._lazy_players) > self.config.performance.lazy_cache_size:
+                self._lazy_players.popitem(last=False)
+
+        if data_version is not None:
+            self.config.update_data_version(data_version)
+        return player_stats
 
     def get_all_stats(self, reload: bool = False) -> dict[str, PlayerStats]:
         """获取所有玩家的统计数据"""
-        if reload or not self._players_stats:
-            self.reload_all_stats()
-        return self._players_stats
+        if reload or not self._loaded:
+            self.refresh_stats()
+
+        snapshot = self._snapshot
+        result: dict[str, PlayerStats] = {}
+        for name, uuid in snapshot.uuid_mapping.items():
+            entry = snapshot.store.get(uuid)
+            if entry is not None:
+                result[name] = PlayerStats(
+                    name=name, uuid=uuid, data_version=entry[0], stats=entry[1]
+                )
+        return result
 
     def get_score(
         self, player: str, category: str, item: str
+    ) -> int | float | None:
+        """
+        获取玩家指定类别和物品的分数
+
+        类别或物品为选择器时返回所有匹配项的总和，类别为 derived 时返回派生指标的值
+        """
+        if is_derived_category(category):
+            return self._get_derived_score(player, item)
+        if is_selector(category) or is_selector(item):
+            return self._get_selector_score(player, category, item)
+        if not self._loaded:
+            stats = self.get_player_stats(player)
+            if stats is None:
+                return None
+            return stats.get_score(category, item)
+
+        # 直接读取单个数值，无需解码玩家的整行数据
+        snapshot = self._snapshot
+        uuid = snapshot.uuid_mapping.get(self.convert_to_name(player))
+        key_id = self._registry.key_id(ensure_prefix(category), ensure_prefix(item))
+        if uuid is None or key_id is None:
+            return None
+        return snapshot.store.value(uuid, key_id)
+
+    def _get_selector_score(
+        self, player: str, category: str, item: str
     ) -> int | None:
-        """获取玩家指定类别和物品的分数"""
-        stats = self.get_player_stats(player)
-        if stats is None:
+        """获取玩家所有匹配选择器的统计项的总和，没有匹配项时返回 None"""
+        if not self._loaded:
+            stats = self.get_player_stats(player)
+            if stats is None:
+                return None
+            category_selector = compile_selector(category)
+            item_selector = compile_selector(item)
+            values = [
+                value
+                for cat, items in stats.stats.items()
+                if category_selector.matches(cat)
+                for name, value in items.items()
+                if item_selector.matches(name)
+            ]
+            return sum(values) if values else None
+
+        snapshot = self._snapshot
+        uuid = snapshot.uuid_mapping.get(self.convert_to_name(player))
+        if uuid is None or uuid not in snapshot.store:
+            return None
+        values = [
+            value
+            for value in (
+                snapshot.store.value(uuid, key_id)
+                for key_id in self._catalog.resolve(category, item)
+            )
+            if value is not None
+        ]
+        return sum(values) if values else None
+
+    def _get_derived_score(self, player: str, name: str) -> int | float | None:
+        """获取玩家的派生指标值"""
+        if name not in self._derived:
+            return None
+        self.ensure_fresh(require_all=True)
+        snapshot = self._snapshot
+        uuid = snapshot.uuid_mapping.get(self.convert_to_name(player))
+        if uuid is None:
             return None
-        return stats.get_score(category, item)
+        uuids, values = self._evaluate_derived(snapshot, name)
+        return dict(zip(uuids, values, strict=True)).get(uuid)
+
+    @property
+    def derived_metrics(self) -> dict[str, DerivedMetric]:
+        """已加载的派生指标 {名称: 指标}"""
+        return dict(self._derived)
+
+    def _evaluate_derived(
+        self, snapshot: StatsSnapshot, name: str
+    ) -> tuple[list[str], list[int | float]]:
+        """
+        对所有玩家一次求值派生指标，结果缓存至所引用的统计项变化
+
+        Returns:
+            (UUID 列表, 数值列表)，指标不存在时均为空
+        """
+        metric = self._derived.get(name)
+        if metric is None:
+            return [], []
+
+        def compute() -> ComputeResult:
+            uuids, values = snapshot.store.compress_rows(*self._derived_vector(snapshot, metric))
+            result = (uuids, [normalize_value(value) for value in values])
+            return result, snapshot.version, self._metric_tags(DERIVED_CATEGORY, name)
+
+        return self._cache.get_or_compute_derived(name, compute)
+
+    def _derived_vector(self, snapshot: StatsSnapshot, metric: DerivedMetric) -> tuple[Any, Any]:
+        """派生指标覆盖全部行的 (数值, 是否存在) 向量"""
+        store = snapshot.store
+        vectors = {
+            ref: store.sum_vector(self._metric_key_ids(ref.category, ref.item))
+            for ref in metric.refs
+        }
+        return metric.evaluate(vectors, store.n_rows)
+
+    def evaluate_derived_stats(
+        self, stats: dict[str, dict[str, int]]
+    ) -> dict[str, int | float]:
+        """对单份统计数据（如全服汇总）求值所有派生指标，跳过没有数据的指标"""
+        result: dict[str, int | float] = {}
+        for name, metric in self._derived.items():
+            value = metric.evaluate_stats(stats)
+            if value is not None:
+                result[name] = value
+        return result
+
+    def resolve_selector(self, category: str, item: str) -> list[tuple[str, str]]:
+        """
+        解析选择器为已知的 (类别, 物品) 列表，均不带 minecraft: 前缀
+
+        Raises:
+            re.error: 正则表达式无效
+        """
+        if not self._loaded:
+            self.ensure_fresh(require_all=True)
+        return self._catalog.resolve_names(category, item)
 
     def get_category_scores(
         self, player: str, category: str
     ) -> dict[str, int] | None:
         """获取玩家某类别下所有物品的分数"""
-        stats = self.get_player_stats(player)
-        if stats is None:
+        if not self._loaded:
+            stats = self.get_player_stats(player)
+            if stats is None:
+                return None
+            return stats.get_category_scores(category)
+
+        # 只读取该类别的数据列
+        snapshot = self._snapshot
+        uuid = snapshot.uuid_mapping.get(self.convert_to_name(player))
+        if uuid is None or uuid not in snapshot.store:
             return None
-        return stats.get_category_scores(category)
+        result: dict[str, int] = {}
+        for key_id in self._registry.category_key_ids(ensure_prefix(category)):
+            value = snapshot.store.value(uuid, key_id)
+            if value is not None:
+                result[self._registry.key(key_id)[1]] = value
+        return result
 
     def get_item_scores(
         self, player: str, item: str
     ) -> dict[str, int] | None:
         """获取玩家某物品在所有类别中的分数"""
-        stats = self.get_player_stats(player)
-        if stats is None:
+        if not self._loaded:
+            stats = self.get_player_stats(player)
+            if stats is None:
+                return None
+            return stats.get_item_scores(item)
+
+        # 通过物品倒排索引直接定位包含该物品的数据列
+        snapshot = self._snapshot
+        uuid = snapshot.uuid_mapping.get(self.convert_to_name(player))
+        if uuid is None or uuid not in snapshot.store:
             return None
-        return stats.get_item_scores(item)
+        result: dict[str, int] = {}
+        for key_id in self._registry.item_key_ids(ensure_prefix(item)):
+            value = snapshot.store.value(uuid, key_id)
+            if value is not None:
+                result[self._registry.key(key_id)[0]] = value
+        return result
 
     def get_ranking(
         self,
@@ -163,109 +963,465 @@ class StatsService:
         limit: int = 15,
     ) -> dict[str, int]:
         """获取排行榜数据"""
-        cached = self._cache.get_ranking(category, item, include_bots)
-        if cached is not None:
-            return dict(sorted(cached.items(), key=lambda x: x[1], reverse=True)[:limit])
+        if category and item:
+            if is_derived_category(category) or is_selector(category) or is_selector(item):
+                return self._get_column_ranking(category, item, include_bots, limit)
+            return self._get_indexed_ranking(category, item, include_bots, limit)
 
-        self.reload_all_stats()
-        result: dict[str, int] = {}
+        def compute() -> ComputeResult:
+            self.ensure_fresh(require_all=True)
+            snapshot = self._snapshot
+            registry = self._registry
+            if category:
+                key_ids = registry.category_key_ids(ensure_prefix(category))
+                tags = [category_tag(ensure_prefix(category))]
+            elif item:
+                key_ids = registry.item_key_ids(ensure_prefix(item))
+                tags = [item_tag(ensure_prefix(item))]
+            else:
+                key_ids = []
+                tags = []
 
-        for name, stats in self._players_stats.items():
-            if not include_bots and is_bot_player(name):
-                continue
+            columns = (snapshot.store.column_entries(key_id) for key_id in key_ids)
+            rows: list[RankingRow] = [
+                (value, player_id, key_ids[index])
+                for index, value, player_id in self._scan_metrics(snapshot, columns, include_bots)
+            ]
+            # 排序一次后缓存有序结果，命中时只需截取前 limit 行
+            rows.sort(key=itemgetter(0), reverse=True)
+            return rows, snapshot.version, tags
 
-            try:
-                if category and item:
-                    score = stats.get_score(category, item)
-                    if score is not None:
-                        result[name] = score
-                elif category:
-                    cat_scores = stats.get_category_scores(category)
-                    for item_key, score in cat_scores.items():
-                        key = f"{name}.{strip_prefix(item_key)}"
-                        result[key] = score
-                elif item:
-                    item_scores = stats.get_item_scores(item)
-                    for cat_key, score in item_scores.items():
-                        key = f"{name}.{strip_prefix(cat_key)}"
-                        result[key] = score
-            except (KeyError, TypeError):
+        rows = self._cache.get_or_compute_ranking(category, item, include_bots, compute)
+        return self._format_ranking(rows, category, item, limit)
+
+    def get_rankings(
+        self,
+        metrics: Iterable[tuple[str, str]],
+        include_bots: bool = False,
+    ) -> MetricRankings:
+        """
+        批量获取多项统计的排行
+
+        只确保一次数据为最新，并在同一快照上一次遍历所有统计项的数据列，
+        同时得到每项的分数与各玩家的总和
+
+        Args:
+            metrics: [(类别, 物品), ...]，类别与物品可为选择器，类别为 derived 时为派生指标
+            include_bots: 是否包含机器人
+
+        Returns:
+            包含全部玩家分数的排行数据
+        """
+        metrics = list(dict.fromkeys(metrics))
+        self.ensure_fresh(require_all=True)
+        snapshot = self._snapshot
+
+        result = MetricRankings(metrics=metrics, scores={metric: {} for metric in metrics})
+        columns = (self._metric_column(snapshot, category, item) for category, item in metrics)
+        player_name = self._registry.player_name
+        totals = result.totals
+        for index, value, player_id in self._scan_metrics(snapshot, columns, include_bots):
+            name = player_name(player_id)
+            result.scores[metrics[index]][name] = value
+            totals[name] = totals.get(name, 0) + value
+        return result
+
+    def _metric_key_ids(self, category: str, item: str) -> tuple[int, ...]:
+        """统计项对应的键 id，选择器可对应多个键"""
+        if is_selector(category) or is_selector(item):
+            return self._catalog.resolve(category, item)
+        key_id = self._registry.key_id(ensure_prefix(category), ensure_prefix(item))
+        return () if key_id is None else (key_id,)
+
+    def _metric_tags(self, category: str, item: str) -> set[str]:
+        """
+        统计项结果的缓存依赖标签
+
+        为所对应键的标签；选择器与尚不存在的键还依赖键字典，新增键时需重新解析
+        """
+        if is_derived_category(category):
+            metric = self._derived.get(item)
+            tags: set[str] = set()
+            for ref in () if metric is None else metric.refs:
+                tags |= self._metric_tags(ref.category, ref.item)
+            return tags
+        key_ids = self._metric_key_ids(category, item)
+        tags = {key_tag(key_id) for key_id in key_ids}
+        if not key_ids or is_selector(category) or is_selector(item):
+            tags.add(CATALOG_TAG)
+        return tags
+
+    def _change_tags(
+        self, before: ColumnarStore, after: ColumnarStore, uuids: Iterable[str]
+    ) -> set[str]:
+        """
+        比较玩家在新旧存储中的数据，得到发生变化的键、类别、物品与玩家标签
+
+        键字典在上次比较后有新增键时额外包含键字典标签
+        """
+        registry = self._registry
+        changed_keys: set[int] = set()
+        tags: set[str] = set()
+        for uuid in uuids:
+            old = before.get_encoded(uuid)
+            new = after.get_encoded(uuid)
+            if old == new:
                 continue
+            tags.add(player_tag(uuid))
+            old_values = old[1] if old else {}
+            new_values = new[1] if new else {}
+            changed_keys.update(
+                key_id
+                for key_id in old_values.keys() | new_values.keys()
+                if old_values.get(key_id) != new_values.get(key_id)
+            )
+            if (old and old[0]) != (new and new[0]):
+                # DataVersion 变化只影响汇总
+                tags.add(ANY_TAG)
+
+        for key_id in changed_keys:
+            category, item = registry.key(key_id)
+            tags.update((key_tag(key_id), category_tag(category), item_tag(item)))
+        if tags:
+            tags.add(ANY_TAG)
+        if len(registry) != self._tagged_keys:
+            self._tagged_keys = len(registry)
+            tags.add(CATALOG_TAG)
+        return tags
+
+    def _metric_column(
+        self, snapshot: StatsSnapshot, category: str, item: str
+    ) -> tuple[list[str], list]:
+        """
+        统计项在快照中的数据列
 
-        self._cache.set_ranking(result, category, item, include_bots)
+        选择器对应的多个键按玩家求和，derived 类别为派生指标的求值结果
 
-        sorted_result = dict(
-            sorted(result.items(), key=lambda x: x[1], reverse=True)[:limit]
+        Returns:
+            (UUID 列表, 数值列表)
+        """
+        if is_derived_category(category):
+            return self._evaluate_derived(snapshot, item)
+        key_ids = self._metric_key_ids(category, item)
+        if len(key_ids) == 1:
+            return snapshot.store.column_entries(key_ids[0])
+        return snapshot.store.sum_rows(key_ids)
+
+    def _metric_vector(
+        self, snapshot: StatsSnapshot, category: str, item: str
+    ) -> tuple[Any, Any]:
+        """统计项在快照中覆盖全部行的 (数值, 是否存在) 向量"""
+        if is_derived_category(category):
+            metric = self._derived.get(item)
+            if metric is None:
+                return snapshot.store.sum_vector(())
+            return self._derived_vector(snapshot, metric)
+        return snapshot.store.sum_vector(self._metric_key_ids(category, item))
+
+    @staticmethod
+    def _scan_metrics(
+        snapshot: StatsSnapshot,
+        columns: Iterable[tuple[list[str], list]],
+        include_bots: bool,
+    ) -> Iterator[tuple[int, Any, int]]:
+        """
+        遍历各统计项的数据列
+
+        Args:
+            snapshot: 读取的快照
+            columns: 每个统计项的 (UUID 列表, 数值列表)
+            include_bots: 是否包含机器人
+
+        Yields:
+            (统计项序号, 数值, 玩家名 id)
+        """
+        player_ids_by_uuid = snapshot.player_ids_by_uuid
+        bot_mask = snapshot.bot_mask
+        n_masked = len(bot_mask)
+        for index, (uuids, values) in enumerate(columns):
+            for uuid, value in zip(uuids, values, strict=True):
+                for player_id in player_ids_by_uuid.get(uuid, ()):
+                    if include_bots or player_id >= n_masked or not bot_mask[player_id]:
+                        yield index, value, player_id
+
+    def _get_indexed_ranking(
+        self, category: str, item: str, include_bots: bool, limit: int
+    ) -> dict[str, int]:
+        """通过排行索引读取单个 (类别, 物品) 的前 limit 名"""
+        self.ensure_fresh(require_all=True)
+        key_id = self._registry.key_id(ensure_prefix(category), ensure_prefix(item))
+        if key_id is None:
+            return {}
+
+        snapshot = self._snapshot
+        top = snapshot.ranking_index.top(
+            key_id,
+            limit,
+            include_bots,
+            snapshot.store,
+            snapshot.names_by_uuid,
+            snapshot.is_bot_name,
         )
-        return sorted_result
+        return dict(top)
 
-    def sum_all_stats(
-        self, players: list[str] | None = None
-    ) -> dict[str, Any]:
-        """汇总所有玩家的统计数据"""
-        players_key = ",".join(sorted(players)) if players else "all"
-        cached = self._cache.get_sum(players_key)
-        if cached is not None:
-            return cached
+    def _get_column_ranking(
+        self, category: str, item: str, include_bots: bool, limit: int
+    ) -> dict[str, int]:
+        """
+        选择器与派生指标的排行
 
-        self.reload_all_stats()
+        选择器按玩家汇总所有匹配的数据列，派生指标对所有玩家一次求值
+        """
+        def compute() -> ComputeResult:
+            self.ensure_fresh(require_all=True)
+            snapshot = self._snapshot
+            rows: list[RankingRow] = [
+                (value, player_id, -1)
+                for _, value, player_id in self._scan_metrics(
+                    snapshot, [self._metric_column(snapshot, category, item)], include_bots
+                )
+            ]
+            rows.sort(key=itemgetter(0), reverse=True)
+            return rows, snapshot.version, self._metric_tags(category, item)
 
-        stats_to_sum = []
-        data_version = None
+        rows = self._cache.get_or_compute_ranking(category, item, include_bots, compute)
+        return self._format_ranking(rows, category, item, limit)
 
-        for name, player_stats in self._players_stats.items():
-            if players is not None and name not in players:
-                continue
-            stats_to_sum.append(player_stats.stats)
-            if player_stats.data_version is not None:
-                data_version = player_stats.data_version
+    def _get_group_index(self, snapshot: StatsSnapshot) -> GroupIndex:
+        """当前快照与分组对应的成员索引"""
+        groups = self.config.groups
+        index = self._group_index
+        if index is None or index.version != snapshot.version or index.revision != groups.revision:
+            index = GroupIndex.build(
+                snapshot.version,
+                groups.revision,
+                groups.groups,
+                snapshot.uuid_mapping,
+                snapshot.store,
+                snapshot.is_bot_name,
+            )
+            self._group_index = index
+        return index
 
-        result = self._merge_stats(stats_to_sum, data_version)
-        self._cache.set_sum(players_key, result)
-        return result
+    def get_group_ranking(
+        self,
+        category: str,
+        item: str,
+        include_bots: bool = False,
+        limit: int = 15,
+    ) -> dict[str, int | float]:
+        """
+        获取分组排行，分组分数为组内成员数值之和
+
+        通过预先构建的 玩家→分组 索引对数据列做一次分组归约，结果缓存至所依赖的统计项或分组变化；
+        类别或物品可为选择器，类别为 derived 时为派生指标
+
+        Returns:
+            按分数降序、同分按分组名排序的 {分组名: 分数}
+        """
+        def compute() -> ComputeResult:
+            self.ensure_fresh(require_all=True)
+            snapshot = self._snapshot
+            index = self._get_group_index(snapshot)
+            totals = index.reduce(
+                *self._metric_vector(snapshot, category, item), include_bots=include_bots
+            )
+            if is_derived_category(category):
+                totals = {name: normalize_value(value) for name, value in totals.items()}
+            ranking = sorted(totals.items(), key=lambda kv: (-kv[1], kv[0]))
+            return ranking, snapshot.version, self._metric_tags(category, item)
 
-    def _merge_stats(
-        self, stats_list: list[dict[str, dict[str, int]]], data_version: int | None
+        ranking = self._cache.get_or_compute_group_ranking(
+            category, item, include_bots, self.config.groups.revision, compute
+        )
+        return dict(ranking[:limit])
+
+    def get_rank_position(
+        self,
+        player: str,
+        category: str,
+        item: str,
+        include_bots: bool = False,
+    ) -> RankPosition | None:
+        """
+        获取玩家在某项统计中的名次
+
+        单个统计项通过排行索引二分查找，与玩家数量无关；
+        选择器与派生指标对汇总或求值后的数据列计数
+
+        Returns:
+            名次信息，玩家或统计项不存在时返回 None
+        """
+        self.ensure_fresh(require_all=True)
+        snapshot = self._snapshot
+        player = self.convert_to_name(player)
+        uuid = snapshot.uuid_mapping.get(player)
+        if uuid is None:
+            return None
+
+        if is_derived_category(category) or is_selector(category) or is_selector(item):
+            uuids, values = self._metric_column(snapshot, category, item)
+            score = None
+            scores: list[int | float] = []
+            for row_uuid, value in zip(uuids, values, strict=True):
+                if row_uuid == uuid:
+                    score = value
+                for name in snapshot.names_by_uuid.get(row_uuid, ()):
+                    if include_bots or not snapshot.is_bot_name(name):
+                        scores.append(value)
+            if score is None:
+                return None
+            higher = sum(1 for value in scores if value > score)
+            not_lower = sum(1 for value in scores if value >= score)
+            total = len(scores)
+        else:
+            key_id = self._registry.key_id(ensure_prefix(category), ensure_prefix(item))
+            score = None if key_id is None else snapshot.store.value(uuid, key_id)
+            if key_id is None or score is None:
+                return None
+            higher, not_lower, total = snapshot.ranking_index.position(
+                key_id,
+                score,
+                include_bots,
+                snapshot.store,
+                snapshot.names_by_uuid,
+                snapshot.is_bot_name,
+            )
+
+        if not include_bots and snapshot.is_bot_name(player):
+            # 机器人不在排除机器人的排行中，按插入该分数计算
+            not_lower += 1
+            total += 1
+        return RankPosition(
+            player=player,
+            category=category,
+            item=item,
+            score=score,
+            position=higher + 1,
+            total=total,
+            percentile=(total - not_lower) / total * 100,
+        )
+
+    def get_distribution(
+        self,
+        category: str,
+        item: str,
+        include_bots: bool = False,
+    ) -> StatDistribution | None:
+        """
+        获取某项统计在玩家间的分布（总和、均值、百分位与直方图）
+
+        直接对数据列做归约，结果缓存至所依赖的统计项变化；
+        类别或物品为选择器时统计每名玩家所有匹配项的总和，类别为 derived 时统计派生指标
+
+        Returns:
+            分布信息，没有玩家拥有该统计时返回 None
+        """
+        distribution = self._cache.get_or_compute_distribution(
+            category,
+            item,
+            include_bots,
+            lambda: self._compute_distribution(category, item, include_bots),
+        )
+        return cast("StatDistribution | None", distribution)
+
+    def _compute_distribution(self, category: str, item: str, include_bots: bool) -> ComputeResult:
+        """计算分布，返回 (分布, 快照版本, 依赖标签)"""
+        self.ensure_fresh(require_all=True)
+        snapshot = self._snapshot
+        store = snapshot.store
+        included = [
+            uuid
+            for uuid, player_ids in snapshot.player_ids_by_uuid.items()
+            if include_bots or not all(snapshot.is_bot_id(i) for i in player_ids)
+        ]
+        mask = store.row_mask(included)
+
+        key_ids = () if is_derived_category(category) else self._metric_key_ids(category, item)
+        if len(key_ids) == 1:
+            values = store.column_values(key_ids[0], mask)
+        else:
+            # 选择器与派生指标：按玩家求值后再统计分布
+            uuids, column = self._metric_column(snapshot, category, item)
+            included_set = set(included)
+            values = [v for uuid, v in zip(uuids, column, strict=True) if uuid in included_set]
+
+        distribution = compute_distribution(category, item, values)
+        return distribution, snapshot.version, self._metric_tags(category, item)
+
+    def _format_ranking(
+        self,
+        rows: list[RankingRow],
+        category: str | None,
+        item: str | None,
+        limit: int,
+    ) -> dict[str, int]:
+        """将按分数降序排列的 id 形式排行榜行转换为 {标签: 分数}，只为前 limit 名构建字符串"""
+        top = rows[:limit]
+        registry = self._registry
+        if category and item:
+            # 选择器汇总排行的标签为玩家名
+            return {registry.player_name(player_id): value for value, player_id, _ in top}
+        # 仅指定类别时标签为 玩家.物品，仅指定物品时为 玩家.类别
+        part = 1 if category else 0
+        return {
+            f"{registry.player_name(player_id)}.{registry.short_key(key_id)[part]}": value
+            for value, player_id, key_id in top
+        }
+
+    def sum_all_stats(
+        self, players: list[str] | None = None
     ) -> dict[str, Any]:
-        """合并统计数据"""
-        merged: dict[str, dict[str, int]] = {}
+        """汇总所有玩家的统计数据"""
+        players_key = "all" if players is None else ",".join(sorted(players))
+        return self._cache.get_or_compute_sum(players_key, lambda: self._compute_sum(players))
+
+    def _compute_sum(self, players: list[str] | None) -> ComputeResult:
+        """计算汇总，返回 (汇总数据, 快照版本, 依赖标签)"""
+        self.ensure_fresh(require_all=True)
+        snapshot = self._snapshot
 
-        for stats in stats_list:
-            for category, items in stats.items():
-                if category not in merged:
-                    merged[category] = {}
-                for item, value in items.items():
-                    merged[category][item] = merged[category].get(item, 0) + value
+        uuids = None
+        if players is not None:
+            uuids = {snapshot.uuid_mapping[p] for p in players if p in snapshot.uuid_mapping}
 
-        result: dict[str, Any] = {"stats": merged}
+        merged = snapshot.store.sum_columns(uuids)
+        data_version = snapshot.store.data_version(uuids)
+
+        result: dict[str, Any] = {"stats": self._registry.decode(merged)}
         if data_version is not None:
             result["DataVersion"] = data_version
-        return result
+        # 全服汇总依赖所有数据，指定玩家的汇总只依赖这些玩家
+        tags = [ANY_TAG] if uuids is None else [player_tag(uuid) for uuid in uuids]
+        return result, snapshot.version, tags
 
     def diff_stats(
         self, first: dict[str, Any], second: dict[str, Any]
     ) -> dict[str, dict[str, int]]:
-        """计算两个统计数据的差值"""
+        """
+        计算两个统计数据的差值
+
+        直接比较字典，不写入全局键注册表，只读的比较不会扩充统计项目录
+        """
         first_stats = first.get("stats", first)
         second_stats = second.get("stats", second)
 
         result: dict[str, dict[str, int]] = {}
-
-        all_categories = set(first_stats.keys()) | set(second_stats.keys())
-        for category in all_categories:
-            first_items = first_stats.get(category, {})
-            second_items = second_stats.get(category, {})
-            all_items = set(first_items.keys()) | set(second_items.keys())
-
-            for item in all_items:
-                diff = abs(
-                    first_items.get(item, 0) - second_items.get(item, 0)
-                )
-                if diff > 0:
-                    if category not in result:
-                        result[category] = {}
-                    result[category][item] = diff
-
+        for category in first_stats.keys() | second_stats.keys():
+            first_items = first_stats.get(category)
+            second_items = second_stats.get(category)
+            if not isinstance(first_items, dict):
+                first_items = {}
+            if not isinstance(second_items, dict):
+                second_items = {}
+            for item in first_items.keys() | second_items.keys():
+                try:
+                    value = abs(int(first_items.get(item, 0)) - int(second_items.get(item, 0)))
+                except (TypeError, ValueError, OverflowError):
+                    # 与加载时一致，跳过非法数值
+                    continue
+                if value > 0:
+                    result.setdefault(category, {})[item] = value
         return result
 
     def save_player_stats(self, player_stats: PlayerStats) -> bool:
@@ -274,7 +1430,7 @@ class StatsService:
             file_path = self.config.paths.stats_path / f"{player_stats.uuid}.json"
             with open(file_path, "w", encoding="utf-8") as f:
                 json.dump(player_stats.to_dict(), f, indent=2)
-            self._cache.invalidate_player(player_stats.name)
+            self._cache.invalidate_player(player_stats.uuid)
             return True
         except OSError as e:
             logger.error(f"Failed to save stats for {player_stats.name}: {e}")
@@ -290,7 +1446,7 @@ class StatsService:
         if file_path.exists():
             try:
                 file_path.unlink()
-                self._cache.invalidate_player(name)
+                self._cache.invalidate_player(uuid)
                 return True
             except OSError as e:
                 logger.error(f"Failed to delete stats for {name}: {e}")
@@ -0,0 +1,562 @@
+# -*- coding: utf-8 -*-
+"""列式统计数据存储模块"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable
+from itertools import compress, repeat
+from typing import TYPE_CHECKING, Any, cast
+
+from .registry import KeyRegistry, get_key_registry
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None  # type: ignore[assignment]
+
+HAS_NUMPY = np is not None
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    from numpy.typing import NDArray
+
+    # 列数据：NumPy 可用时为数组，否则数值为 array('q')，存在标记为 bytearray
+    ColumnValues: TypeAlias = NDArray[np.int64] | array[int]
+    ColumnMask: TypeAlias = NDArray[np.bool_] | bytearray
+
+
+class _Column:
+    """单个 (类别, 物品) 键的数据列，按玩家行号存放数值"""
+
+    __slots__ = ("values", "present")
+
+    values: ColumnValues
+    present: ColumnMask
+
+    def __init__(
+        self,
+        capacity: int,
+        values: ColumnValues | None = None,
+        present: ColumnMask | None = None,
+    ):
+        if values is not None and present is not None:
+            self.values = values
+            self.present = present
+        elif HAS_NUMPY:
+            self.values = np.zeros(capacity, dtype=np.int64)
+            self.present = np.zeros(capacity, dtype=np.bool_)
+        else:
+            self.values = array("q", bytes(8 * capacity))
+            self.present = bytearray(capacity)
+
+    def copy(self, capacity: int | None = None) -> _Column:
+        """复制该列，可同时扩容"""
+        size = len(self.present)
+        capacity = capacity or size
+        if HAS_NUMPY:
+            values = np.zeros(capacity, dtype=np.int64)
+            present = np.zeros(capacity, dtype=np.bool_)
+            values[:size] = self.values
+            present[:size] = self.present
+            return _Column(capacity, values, present)
+        array_values = array("q", self.values)
+        array_present = bytearray(self.present)
+        array_values.frombytes(bytes(8 * (capacity - size)))
+        array_present.extend(bytes(capacity - size))
+        return _Column(capacity, array_values, array_present)
+
+    def set(self, row: int, value: int) -> None:
+        self.values[row] = value
+        self.present[row] = True
+
+    def clear(self, row: int) -> None:
+        self.values[row] = 0
+        self.present[row] = False
+
+    def arrays(self) -> tuple[NDArray[np.int64], NDArray[np.bool_]]:
+        """NumPy 可用时的 (数值, 存在标记) 数组"""
+        return cast("NDArray[np.int64]", self.values), cast("NDArray[np.bool_]", self.present)
+
+    def entries(self, n_rows: int) -> tuple[list[int], list[int]]:
+        """(行号列表, 数值列表)"""
+        if HAS_NUMPY:
+            values, present = self.arrays()
+            indices = np.flatnonzero(present[:n_rows])
+            return indices.tolist(), values[indices].tolist()
+        rows = list(compress(range(n_rows), self.present))
+        column_values = self.values
+        return rows, [column_values[row] for row in rows]
+
+    def reduce(self, n_rows: int, mask: Any = None) -> tuple[int, int]:
+        """
+        列归约
+
+        Args:
+            n_rows: 有效行数
+            mask: 可选的行掩码
+
+        Returns:
+            (存在数值的行数, 总和)
+        """
+        if HAS_NUMPY:
+            values, present = self.arrays()
+            rows_present = present[:n_rows]
+            if mask is not None:
+                rows_present = rows_present & mask
+            return int(np.count_nonzero(rows_present)), int(values[:n_rows][rows_present].sum())
+        if mask is None:
+            # 不存在的行数值为 0，可直接求和
+            return cast(bytearray, self.present)[:n_rows].count(1), sum(self.values[:n_rows])
+        flags = self.present
+        column_values = self.values
+        rows = [row for row in compress(range(n_rows), mask) if flags[row]]
+        return len(rows), sum(column_values[row] for row in rows)
+
+
+class ColumnarStore:
+    """
+    列式统计数据存储
+
+    (类别, 物品) 键由全局 KeyRegistry 编码为整数 id，每个键对应一列，
+    列中按玩家行号存放数值。可用时使用 NumPy 数组，否则使用 array('q')。
+    行以 UUID 为键，名称映射由调用方维护
+    """
+
+    def __init__(self, capacity: int = 64, registry: KeyRegistry | None = None):
+        self._capacity = capacity
+        self.registry = registry or get_key_registry()
+        # 行信息
+        self._row_of: dict[str, int] = {}
+        self._uuids: list[str | None] = []
+        self._data_versions: list[int | None] = []
+        self._row_keys: list[tuple[int, ...]] = []
+        self._free_rows: list[int] = []
+        # 数据列 {键 id: 列}
+        self._columns: dict[int, _Column] = {}
+        # 本存储独占（可直接写入）的列，其余列与 fork 来源共享
+        self._owned: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, uuid: object) -> bool:
+        return uuid in self._row_of
+
+    @property
+    def n_rows(self) -> int:
+        """已分配的行数（含空闲行）"""
+        return len(self._uuids)
+
+    def uuids(self) -> list[str]:
+        """所有玩家 UUID"""
+        return list(self._row_of)
+
+    def uuid_at(self, row: int) -> str | None:
+        """根据行号获取 UUID"""
+        return self._uuids[row]
+
+    def row_of(self, uuid: str) -> int | None:
+        """根据 UUID 获取行号"""
+        return self._row_of.get(uuid)
+
+    def fork(self) -> ColumnarStore:
+        """
+        创建写时复制的副本
+
+        副本与原存储共享全部数据列，某列首次被写入时才复制，
+        因此修改副本不会影响原存储
+        """
+        other = ColumnarStore(self._capacity, self.registry)
+        other._row_of = dict(self._row_of)
+        other._uuids = list(self._uuids)
+        other._data_versions = list(self._data_versions)
+        other._row_keys = list(self._row_keys)
+        other._free_rows = list(self._free_rows)
+        other._columns = dict(self._columns)
+        return other
+
+    def _writable_column(self, key_id: int) -> _Column:
+        """获取可写入的列，共享的列会先被复制"""
+        column = self._columns.get(key_id)
+        if column is not None and key_id in self._owned:
+            return column
+        column = column.copy() if column is not None else _Column(self._capacity)
+        self._columns[key_id] = column
+        self._owned.add(key_id)
+        return column
+
+    def key_ids(self) -> list[int]:
+        """存在数据列的所有键 id"""
+        return list(self._columns)
+
+    def has_key(self, key_id: int) -> bool:
+        """是否存在该键的数据列"""
+        return key_id in self._columns
+
+    # ---------- 行读写 ----------
+
+    def _allocate_row(self, uuid: str) -> int:
+        """为玩家分配行号，容量不足时所有列扩容一倍"""
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._uuids[row] = uuid
+            self._data_versions[row] = None
+            self._row_keys[row] = ()
+        else:
+            row = len(self._uuids)
+            self._uuids.append(uuid)
+            self._data_versions.append(None)
+            self._row_keys.append(())
+            if row >= self._capacity:
+                self._capacity *= 2
+                self._columns = {
+                    key_id: column.copy(self._capacity)
+                    for key_id, column in self._columns.items()
+                }
+                self._owned = set(self._columns)
+        self._row_of[uuid] = row
+        return row
+
+    @classmethod
+    def build(
+        cls,
+        entries: Iterable[tuple[str, int | None, dict[str, dict[str, int]]]],
+        registry: KeyRegistry | None = None,
+    ) -> ColumnarStore:
+        """
+        由全部玩家的数据一次性构建存储，用于全量加载
+
+        先将每个玩家编码为 {键 id: 数值}，再按列整体写入，
+        不经过 put 的逐格存在与变化判断
+
+        Args:
+            entries: [(UUID, DataVersion, stats), ...]，UUID 不可重复
+            registry: 键字典
+        """
+        store = cls(registry=registry)
+        encode = store.registry.encode
+        # 所有数值格的 (键 id, 行号, 数值)
+        cell_keys = array("q")
+        cell_rows = array("q")
+        cell_values = array("q")
+        for row, (uuid, data_version, stats) in enumerate(entries):
+            encoded = encode(stats)
+            store._row_of[uuid] = row
+            store._uuids.append(uuid)
+            store._data_versions.append(data_version)
+            store._row_keys.append(tuple(encoded))
+            cell_keys.extend(encoded)
+            cell_values.extend(encoded.values())
+            cell_rows.extend(repeat(row, len(encoded)))
+
+        while store._capacity < len(store._uuids):
+            store._capacity *= 2
+        capacity = store._capacity
+
+        if HAS_NUMPY:
+            keys = np.frombuffer(cell_keys, dtype=np.int64)
+            order = np.argsort(keys, kind="stable")
+            keys = keys[order]
+            rows = np.frombuffer(cell_rows, dtype=np.int64)[order]
+            values = np.frombuffer(cell_values, dtype=np.int64)[order]
+            # 按键 id 排序后每个键的数值格连续，逐列一次写入
+            bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+            starts = [0, *bounds.tolist()]
+            ends = [*bounds.tolist(), len(keys)]
+            for start, end in zip(starts, ends, strict=True):
+                if start == end:
+                    continue
+                column = _Column(capacity)
+                column_values, column_present = column.arrays()
+                segment = rows[start:end]
+                column_values[segment] = values[start:end]
+                column_present[segment] = True
+                store._columns[int(keys[start])] = column
+        else:
+            columns = store._columns
+            for key_id, row, value in zip(cell_keys, cell_rows, cell_values, strict=True):
+                target = columns.get(key_id)
+                if target is None:
+                    target = columns[key_id] = _Column(capacity)
+                target.values[row] = value
+                target.present[row] = 1
+
+        store._owned = set(store._columns)
+        return store
+
+    def put(
+        self,
+        uuid: str,
+        data_version: int | None,
+        stats: dict[str, dict[str, int]],
+    ) -> None:
+        """写入（或覆盖）一个玩家的统计数据，用于增量更新，全量加载使用 build"""
+        row = self._row_of.get(uuid)
+        if row is None:
+            row = self._allocate_row(uuid)
+
+        encoded = self.registry.encode(stats)
+        columns = self._columns
+        for key_id, value in encoded.items():
+            column = columns.get(key_id)
+            # 数值未变化的列无需写入，避免复制共享列
+            if column is not None and column.present[row] and column.values[row] == value:
+                continue
+            self._writable_column(key_id).set(row, value)
+
+        for key_id in self._row_keys[row]:
+            if key_id not in encoded:
+                self._writable_column(key_id).clear(row)
+
+        self._row_keys[row] = tuple(encoded)
+        self._data_versions[row] = data_version
+
+    def remove(self, uuid: str) -> bool:
+        """移除一个玩家"""
+        row = self._row_of.pop(uuid, None)
+        if row is None:
+            return False
+        for key_id in self._row_keys[row]:
+            self._writable_column(key_id).clear(row)
+        self._uuids[row] = None
+        self._data_versions[row] = None
+        self._row_keys[row] = ()
+        self._free_rows.append(row)
+        return True
+
+    def get_encoded(self, uuid: str) -> tuple[int | None, dict[int, int]] | None:
+        """读取一个玩家的 (DataVersion, {键 id: 数值})"""
+        row = self._row_of.get(uuid)
+        if row is None:
+            return None
+        columns = self._columns
+        encoded = {key_id: int(columns[key_id].values[row]) for key_id in self._row_keys[row]}
+        return self._data_versions[row], encoded
+
+    def get(self, uuid: str) -> tuple[int | None, dict[str, dict[str, int]]] | None:
+        """读取一个玩家的 (DataVersion, stats)"""
+        entry = self.get_encoded(uuid)
+        if entry is None:
+            return None
+        return entry[0], self.registry.decode(entry[1])
+
+    def row_key_ids(self, uuid: str) -> tuple[int, ...]:
+        """某玩家拥有数值的键 id"""
+        row = self._row_of.get(uuid)
+        return () if row is None else self._row_keys[row]
+
+    def value(self, uuid: str, key_id: int) -> int | None:
+        """读取单个数值，不存在时返回 None"""
+        row = self._row_of.get(uuid)
+        column = self._columns.get(key_id)
+        if row is None or column is None or not column.present[row]:
+            return None
+        return int(column.values[row])
+
+    def data_version(self, uuids: Iterable[str] | None = None) -> int | None:
+        """最大的 DataVersion"""
+        if uuids is None:
+            versions = self._data_versions
+        else:
+            versions = [self._data_versions[self._row_of[u]] for u in uuids if u in self._row_of]
+        return max((v for v in versions if v is not None), default=None)
+
+    # ---------- 导入导出 ----------
+
+    def export_state(self) -> dict[str, Any]:
+        """
+        导出为仅包含内置类型的结构
+
+        列数据以原始字节导出，NumPy 与 array('q') 的内存布局相同，可互相导入。
+        键 id 仅在进程内有效，因此导出 (类别, 物品) 字符串，行内键以列序号表示
+        """
+        key_ids = list(self._columns)
+        position = {key_id: index for index, key_id in enumerate(key_ids)}
+        row_key_data = array("i")
+        row_key_offsets = array("q", [0])
+        for keys in self._row_keys:
+            row_key_data.extend(position[key_id] for key_id in keys)
+            row_key_offsets.append(len(row_key_data))
+
+        return {
+            "capacity": self._capacity,
+            "uuids": list(self._uuids),
+            "data_versions": list(self._data_versions),
+            "row_key_data": row_key_data.tobytes(),
+            "row_key_offsets": row_key_offsets.tobytes(),
+            "keys": [self.registry.key(key_id) for key_id in key_ids],
+            "values": [self._columns[key_id].values.tobytes() for key_id in key_ids],
+            "present": [bytes(self._columns[key_id].present) for key_id in key_ids],
+        }
+
+    @classmethod
+    def from_state(
+        cls, state: dict[str, Any], registry: KeyRegistry | None = None
+    ) -> ColumnarStore:
+        """从 export_state 的结果恢复"""
+        store = cls(capacity=state["capacity"], registry=registry)
+        store._uuids = list(state["uuids"])
+        store._data_versions = list(state["data_versions"])
+
+        key_ids = [store.registry.intern_key(category, item) for category, item in state["keys"]]
+        if not (len(key_ids) == len(state["values"]) == len(state["present"])):
+            raise ValueError("Column count does not match key count")
+
+        row_key_data = array("i")
+        row_key_data.frombytes(state["row_key_data"])
+        offsets = array("q")
+        offsets.frombytes(state["row_key_offsets"])
+        store._row_keys = [
+            tuple(key_ids[index] for index in row_key_data[offsets[i]:offsets[i + 1]])
+            for i in range(len(store._uuids))
+        ]
+
+        for row, uuid in enumerate(store._uuids):
+            if uuid is None:
+                store._free_rows.append(row)
+            else:
+                store._row_of[uuid] = row
+
+        for key_id, values_bytes, present_bytes in zip(
+            key_ids, state["values"], state["present"], strict=True
+        ):
+            if HAS_NUMPY:
+                values = np.frombuffer(values_bytes, dtype=np.int64).copy()
+                present = np.frombuffer(present_bytes, dtype=np.bool_).copy()
+            else:
+                values = array("q")
+                values.frombytes(values_bytes)
+                present = bytearray(present_bytes)
+            store._columns[key_id] = _Column(store._capacity, values, present)
+        store._owned = set(store._columns)
+        return store
+
+    # ---------- 列扫描 ----------
+
+    def column_entries(self, key_id: int) -> tuple[list[str], list[int]]:
+        """某列中存在数值的 (UUID 列表, 数值列表)"""
+        column = self._columns.get(key_id)
+        if column is None:
+            return [], []
+        rows, values = column.entries(self.n_rows)
+        # 存在数值的行均已分配给玩家
+        uuids = cast("list[str]", self._uuids)
+        return [uuids[row] for row in rows], values
+
+    def row_mask(self, uuids: Iterable[str]) -> Any:
+        """构建行掩码，仅 uuids 对应的行为真"""
+        n_rows = self.n_rows
+        rows = [self._row_of[u] for u in uuids if u in self._row_of]
+        if HAS_NUMPY:
+            array_mask = np.zeros(n_rows, dtype=np.bool_)
+            array_mask[rows] = True
+            return array_mask
+        mask = bytearray(n_rows)
+        for row in rows:
+            mask[row] = 1
+        return mask
+
+    def column_values(self, key_id: int, mask: Any = None) -> Any:
+        """
+        某列中存在数值的全部数值
+
+        Args:
+            key_id: 键 id
+            mask: 可选的行掩码
+
+        Returns:
+            NumPy 可用时为 int64 数组，否则为列表
+        """
+        n_rows = self.n_rows
+        column = self._columns.get(key_id)
+        if HAS_NUMPY:
+            if column is None:
+                return np.zeros(0, dtype=np.int64)
+            array_values, present = column.arrays()
+            present = present[:n_rows]
+            if mask is not None:
+                present = present & mask
+            return array_values[:n_rows][present]
+        if column is None:
+            return []
+        rows, values = column.entries(n_rows)
+        if mask is None:
+            return values
+        return [value for row, value in zip(rows, values, strict=True) if mask[row]]
+
+    def column_total(self, key_id: int) -> int:
+        """某列的总和"""
+        column = self._columns.get(key_id)
+        return column.reduce(self.n_rows)[1] if column is not None else 0
+
+    def sum_columns(self, uuids: Iterable[str] | None = None) -> dict[int, int]:
+        """
+        按列求和
+
+        Args:
+            uuids: 参与求和的玩家，为 None 时为全部玩家
+
+        Returns:
+            {键 id: 总和}，仅包含至少一名玩家拥有的键
+        """
+        n_rows = self.n_rows
+        mask = None if uuids is None else self.row_mask(uuids)
+
+        result: dict[int, int] = {}
+        for key_id, column in self._columns.items():
+            count, total = column.reduce(n_rows, mask)
+            if count:
+                result[key_id] = total
+        return result
+
+    def sum_vector(self, key_ids: Iterable[int]) -> tuple[Any, Any]:
+        """
+        按行汇总多列，返回覆盖全部行的向量
+
+        Returns:
+            (合计, 是否存在数值)，NumPy 可用时为 int64 与 bool 数组，否则为列表与 bytearray
+        """
+        n_rows = self.n_rows
+        columns = [self._columns[k] for k in key_ids if k in self._columns]
+        if HAS_NUMPY:
+            array_totals = np.zeros(n_rows, dtype=np.int64)
+            array_present = np.zeros(n_rows, dtype=np.bool_)
+            for column in columns:
+                values, present = column.arrays()
+                # 不存在的行数值为 0，可直接累加
+                array_totals += values[:n_rows]
+                array_present |= present[:n_rows]
+            return array_totals, array_present
+
+        totals = [0] * n_rows
+        flags = bytearray(n_rows)
+        for column in columns:
+            rows, row_values = column.entries(n_rows)
+            for row, value in zip(rows, row_values, strict=True):
+                totals[row] += value
+                flags[row] = 1
+        return totals, flags
+
+    def compress_rows(self, values: Any, present: Any) -> tuple[list[str], list]:
+        """按存在掩码筛选行向量，返回 (UUID 列表, 数值列表)"""
+        # 存在数值的行均已分配给玩家
+        uuids = cast("list[str]", self._uuids)
+        if HAS_NUMPY:
+            indices = np.flatnonzero(present)
+            return [uuids[row] for row in indices.tolist()], values[indices].tolist()
+        rows = list(compress(range(len(present)), present))
+        return [uuids[row] for row in rows], [values[row] for row in rows]
+
+    def sum_rows(self, key_ids: Iterable[int]) -> tuple[list[str], list[int]]:
+        """
+        按行汇总多列，一次遍历所有匹配列
+
+        Args:
+            key_ids: 参与汇总的键 id
+
+        Returns:
+            在任一列中存在数值的 (UUID 列表, 合计列表)
+        """
+        return self.compress_rows(*self.sum_vector(key_ids))
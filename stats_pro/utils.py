@@ -4,13 +4,16 @@
 from __future__ import annotations
 
 import json
+import os
 import time
+from collections.abc import Iterable
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from mcdreforged.api.rtext import RAction, RText, RTextList
 
-from .constants import BOT_KEYWORDS, MINECRAFT_PREFIX
+from .constants import MINECRAFT_PREFIX
+from .models import FileState
 
 if TYPE_CHECKING:
     from mcdreforged.api.all import Info, ServerInterface
@@ -35,12 +38,6 @@ def strip_prefix(value: str) -> str:
     return value
 
 
-def is_bot_player(name: str) -> bool:
-    """判断是否为机器人玩家"""
-    name_lower = name.lower()
-    return any(keyword in name_lower for keyword in BOT_KEYWORDS)
-
-
 def generate_abbreviation(item: str) -> str:
     """生成物品缩写"""
     if "_" in item:
@@ -161,7 +158,43 @@ def load_usercache(usercache_file: Path) -> dict[str, str]:
         return {}
 
 
-def build_uuid_mapping_from_stats(stats_path: Path, usercache_file: Path) -> dict[str, str]:
+def get_file_state(path: Path) -> FileState | None:
+    """获取文件状态，文件不存在时返回 None"""
+    try:
+        return FileState.from_stat(path.stat())
+    except OSError:
+        return None
+
+
+def scan_stats_files(stats_path: Path) -> dict[str, FileState]:
+    """
+    扫描 stats 文件夹
+
+    Returns:
+        {uuid: FileState} 映射
+    """
+    states: dict[str, FileState] = {}
+    if not stats_path.exists():
+        return states
+
+    with os.scandir(stats_path) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                states[entry.name[:-5]] = FileState.from_stat(entry.stat())
+            except OSError:
+                continue
+    return states
+
+
+def build_uuid_mapping_from_stats(
+    stats_path: Path,
+    usercache_file: Path,
+    uuids: Iterable[str] | None = None,
+) -> dict[str, str]:
     """
     构建 UUID 映射，优先使用 usercache.json，
     对于 usercache 中没有的 UUID，使用 UUID 本身作为临时名称
@@ -169,6 +202,7 @@ def build_uuid_mapping_from_stats(stats_path: Path, usercache_file: Path) -> dic
     Args:
         stats_path: stats 文件夹路径
         usercache_file: usercache.json 文件路径
+        uuids: 已扫描得到的 UUID 列表，传入时不再重复遍历 stats 文件夹
     
     Returns:
         {name: uuid} 映射
@@ -181,19 +215,20 @@ def build_uuid_mapping_from_stats(stats_path: Path, usercache_file: Path) -> dic
     uuid_to_name_map = {v: k for k, v in usercache_mapping.items()}
     
     # 遍历 stats 文件夹中的所有 json 文件
-    if stats_path.exists():
-        for stats_file in stats_path.glob("*.json"):
-            uuid = stats_file.stem  # 文件名（不含扩展名）就是 UUID
-            
-            if uuid in uuid_to_name_map:
-                # usercache 中有这个 UUID 的名称
-                name = uuid_to_name_map[uuid]
-            else:
-                # usercache 中没有，使用 UUID 作为临时名称
-                # 去掉 UUID 中的横线，取前8位作为显示名
-                name = uuid.replace("-", "")[:8]
-            
-            mapping[name] = uuid
+    if uuids is None:
+        # 文件名（不含扩展名）就是 UUID
+        uuids = [f.stem for f in stats_path.glob("*.json")] if stats_path.exists() else []
+
+    for uuid in uuids:
+        if uuid in uuid_to_name_map:
+            # usercache 中有这个 UUID 的名称
+            name = uuid_to_name_map[uuid]
+        else:
+            # usercache 中没有，使用 UUID 作为临时名称
+            # 去掉 UUID 中的横线，取前8位作为显示名
+            name = uuid.replace("-", "")[:8]
+        
+        mapping[name] = uuid
     
     return mapping
 
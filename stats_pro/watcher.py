@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""stats 文件监视模块"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import threading
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+from .constants import PLUGIN_ID
+from .models import FileState
+from .utils import get_file_state, scan_stats_files
+
+logger = logging.getLogger(PLUGIN_ID)
+
+# inotify 事件掩码
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_CLOEXEC = 0o2000000
+_IN_NONBLOCK = 0o0004000
+
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE | _IN_DELETE_SELF
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """基于 ctypes 的最小 inotify 封装"""
+
+    def __init__(self) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not supported on this platform")
+
+        self._libc = libc
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self._libc.inotify_init1(_IN_CLOEXEC | _IN_NONBLOCK)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path: Path, mask: int = _WATCH_MASK) -> int:
+        wd: int = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(path))
+        return wd
+
+    def read_events(self, timeout: float) -> list[tuple[int, int, str]]:
+        """读取事件 [(wd, mask, name), ...]，超时返回空列表"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class StatsWatcher:
+    """
+    stats 文件监视器
+
+    监视 world/stats 与 usercache.json，将单个文件的变化推送给回调。
+    优先使用 inotify，不可用时回退为轮询
+    """
+
+    def __init__(
+        self,
+        stats_path: Path,
+        usercache_file: Path,
+        on_stats_files: Callable[[set[str]], object],
+        on_usercache: Callable[[], object],
+        on_resync: Callable[[], object],
+        mode: str = "auto",
+        poll_interval: float = 2.0,
+    ):
+        """
+        初始化监视器
+
+        Args:
+            stats_path: stats 文件夹路径
+            usercache_file: usercache.json 文件路径
+            on_stats_files: stats 文件变化回调，参数为一批变化文件的 UUID 集合
+            on_usercache: usercache.json 变化回调
+            on_resync: 事件丢失时的全量同步回调
+            mode: auto / inotify / poll
+            poll_interval: 轮询间隔（秒）
+        """
+        self.stats_path = stats_path
+        self.usercache_file = usercache_file
+        self._on_stats_files = on_stats_files
+        self._on_usercache = on_usercache
+        self._on_resync = on_resync
+        self._mode = mode
+        self._poll_interval = poll_interval
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._backend: str | None = None
+
+    @property
+    def backend(self) -> str | None:
+        """当前使用的后端：inotify / poll，未运行时为 None"""
+        return self._backend if self.is_running else None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """启动监视线程"""
+        if self.is_running:
+            return True
+
+        target: Callable[[], None] = self._poll_loop
+        self._backend = "poll"
+        if self._mode in ("auto", "inotify"):
+            try:
+                inotify = _Inotify()
+            except OSError as e:
+                if self._mode == "inotify":
+                    logger.warning(f"inotify unavailable, falling back to polling: {e}")
+            else:
+                target = partial(self._inotify_loop, inotify)
+                self._backend = "inotify"
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=target, name="StatsPro-Watcher", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Stats watcher started ({self._backend})")
+        return True
+
+    def stop(self) -> None:
+        """停止监视线程"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._backend = None
+
+    def _dispatch(self, uuids: set[str], usercache: bool, resync: bool) -> None:
+        """分发事件，回调异常不会终止监视线程"""
+        try:
+            if resync:
+                self._on_resync()
+                return
+            if usercache:
+                self._on_usercache()
+            if uuids:
+                # 整批交给回调，去抖后的一批变化只发布一次快照
+                self._on_stats_files(uuids)
+        except Exception:
+            logger.exception("Stats watcher callback failed")
+
+    def _inotify_loop(self, inotify: _Inotify) -> None:
+        """inotify 事件循环"""
+        stats_wd = server_wd = -1
+        try:
+            server_wd = inotify.add_watch(self.usercache_file.parent)
+            while not self._stop_event.is_set():
+                if stats_wd < 0 and self.stats_path.exists():
+                    stats_wd = inotify.add_watch(self.stats_path)
+                    # 监视建立前的变化无法得知，全量同步一次
+                    self._dispatch(set(), False, True)
+
+                uuids: set[str] = set()
+                usercache = resync = False
+                for wd, mask, name in inotify.read_events(timeout=0.5):
+                    if mask & _IN_Q_OVERFLOW:
+                        resync = True
+                    elif wd == stats_wd:
+                        if mask & (_IN_IGNORED | _IN_DELETE_SELF):
+                            stats_wd = -1
+                            resync = True
+                        elif name.endswith(".json"):
+                            uuids.add(name[:-5])
+                    elif wd == server_wd and name == self.usercache_file.name:
+                        usercache = True
+
+                if uuids or usercache or resync:
+                    self._dispatch(uuids, usercache, resync)
+        except OSError as e:
+            if e.errno != errno.EBADF:
+                logger.error(f"Stats watcher stopped unexpectedly: {e}")
+        finally:
+            inotify.close()
+
+    def _poll_loop(self) -> None:
+        """轮询循环"""
+        stats_states: dict[str, FileState] = scan_stats_files(self.stats_path)
+        usercache_state = get_file_state(self.usercache_file)
+
+        while not self._stop_event.wait(self._poll_interval):
+            states = scan_stats_files(self.stats_path)
+            uuids = {
+                uuid for uuid, state in states.items()
+                if stats_states.get(uuid) != state
+            }
+            uuids.update(uuid for uuid in stats_states if uuid not in states)
+            stats_states = states
+
+            new_usercache_state = get_file_state(self.usercache_file)
+            usercache = new_usercache_state != usercache_state
+            usercache_state = new_usercache_state
+
+            if uuids or usercache:
+                self._dispatch(uuids, usercache, False)